@@ -2,7 +2,26 @@ import streamlit as st
 import pandas as pd
 import numpy as np
 import random
-import base64
+import hashlib
+import io
+import os
+import datetime
+import threading
+from collections import OrderedDict
+
+from dataweaver.baskets import basket_layout, layout_fields
+from dataweaver.bootstrap import MAX_BOOTSTRAP_POSITIONS, bootstrap_replicates, write_bootstrap_archive
+from dataweaver.clusters import fit_cluster_model, stream_clusters_to_csv
+from dataweaver.copula import fit_copula_model, stream_copula_to_csv
+from dataweaver.datasets import catalog_datasets, dataset_columns, dataset_overview, file_digest, load_dataset
+from dataweaver.export import new_output_dir, output_file_path, stream_resample_to_csv, write_csv_chunks
+from dataweaver.itemsets import MAX_ITEMSET_SIZE, MIN_CONFIDENCE, MIN_SUPPORT, compare_rules, dataset_rules, sample_rules
+from dataweaver.parallel import SHARD_ROWS, generate_sharded, shard_paths, shard_plan
+from dataweaver.rng import seeded_rng
+from dataweaver.sampling import read_csv_columns, reservoir_sample_csv, sample_dataset, sample_rows
+from dataweaver.specs import FIELD_SPEC_DEFAULTS, SPEC_DISTRIBUTIONS, compile_field_specs, specs_from_json, specs_to_json
+from dataweaver.stats import StreamingSummary, compute_overview, summarize
+from dataweaver.synthetic import SYNTHETIC_FIELD_KINDS, fit_synthetic_model, parse_template, stream_synthetic_to_csv
     
 st.set_page_config(
     page_title="Data Weaver",
@@ -10,6 +29,323 @@ st.set_page_config(
     layout="wide"
 )
 
+# Large generated files bigger than this are not offered for browser download
+MAX_DOWNLOAD_BYTES = 200 * 2**20
+
+# Downloads
+def csv_download_button(df, label, file_name="generated_dataset.csv"):
+    """Render a download button whose CSV is only produced when the user clicks it.
+
+    Streamlit runs the callable on click and serves the result from its media endpoint,
+    so reruns no longer encode the dataset into the page.
+    """
+    def build_csv():
+        buffer = io.BytesIO()
+        text = io.TextIOWrapper(buffer, encoding="utf-8", newline="")
+        write_csv_chunks(df, text)
+        text.flush()
+        text.detach()
+        buffer.seek(0)
+        return buffer
+
+    st.download_button(label, data=build_csv, file_name=file_name, mime="text/csv", on_click="ignore")
+
+def session_output_path(file_name, extension=".csv"):
+    """output_file_path() inside this session's own directory, so sessions never overwrite each other's files.
+
+    The user's file name is kept as the file's name, which is also the name it downloads as.
+    """
+    directory = st.session_state.get("output_dir")
+    if directory is None or not os.path.isdir(directory):
+        directory = st.session_state["output_dir"] = new_output_dir()
+    return output_file_path(file_name, extension, directory)
+
+def file_download_button(path, label, mime="text/csv"):
+    """Offer a generated file for download, or point at it on disk when it is too large."""
+    if os.path.getsize(path) > MAX_DOWNLOAD_BYTES:
+        st.info(f"ℹ️ The file is too large to download through the browser. It is saved at `{path}`.")
+        return
+
+    def read_file():
+        with open(path, "rb") as f:
+            return f.read()
+
+    st.download_button(label, data=read_file, file_name=os.path.basename(path), mime=mime, on_click="ignore")
+
+# Sampling modes for datasets with a label column; stratified and balanced samples draw
+# each class's rows from per-class index arrays built once per dataset, and SMOTE rows are
+# interpolated towards nearest neighbours also found once per dataset
+SAMPLING_MODES = {
+    "🎲 Random rows": None,
+    "⚖️ Stratified (keep class proportions)": "stratified",
+    "🟰 Class-balanced (equal rows per class)": "balanced",
+    "🧪 Class-balanced with new rows (SMOTE)": "smote",
+}
+
+# Sampling modes for the Association datasets; whole transactions are drawn from the
+# transaction x item encoding built once per dataset
+BASKET_SAMPLING_MODES = {
+    "🧺 Whole transactions": ("transactions", None),
+    "🎲 Random rows": None,
+}
+
+# Samples generated on the ML pages, kept in the session so reruns do not resample
+SAMPLE_CACHE_SIZE = 8
+
+def cached_sample(sample_key):
+    """Return the rows sampled for (dataset path, seed, fields, row count, sampling), sampling on first use.
+
+    Only the selected fields are loaded from the dataset. sampling is None for uniformly random
+    rows, or a (mode, label column) pair for a stratified, class-balanced, oversampled or
+    whole-transaction sample.
+
+    The latest SAMPLE_CACHE_SIZE samples are kept in the session, so widget changes and
+    downloads reuse them instead of copying and resampling the dataset on every rerun.
+    """
+    samples = st.session_state.setdefault("generated_samples", {})
+    if sample_key not in samples:
+        dataset_url, seed, fields, num_rows, sampling = sample_key
+        mode, label_column = sampling or (None, None)
+        samples[sample_key] = sample_dataset(dataset_url, fields, num_rows, seed, mode, label_column)
+        while len(samples) > SAMPLE_CACHE_SIZE:
+            samples.pop(next(iter(samples)))
+    return samples[sample_key]
+
+def cached_sample_overview(sample_key):
+    """Return the overview of a generated sample, computing it the first time it is opened."""
+    overviews = st.session_state.setdefault("sample_overviews", {})
+    if sample_key not in overviews:
+        overviews[sample_key] = compute_overview(cached_sample(sample_key))
+        for stale in [key for key in overviews if key not in st.session_state["generated_samples"]]:
+            del overviews[stale]
+    return overviews[sample_key]
+
+def bootstrap_download(entry, fields, seed):
+    """Offer bootstrap replicates of the selected fields of a catalog dataset as one archive of row indices.
+
+    All replicates come from one vectorized draw of a (replicates x rows) index matrix; the
+    archive holds the rows once, that matrix and each replicate's out-of-bag rows.
+    """
+    with st.expander("🔁 Bootstrap replicates (for model evaluation)"):
+        st.write("Each replicate draws as many rows as the dataset has, with replacement. The archive holds the "
+                 "rows once (`data.csv`), the replicates as row indices (`indices.npy`) and the rows each replicate "
+                 "left out (`oob_indptr.npy`, `oob_indices.npy`).")
+        dataset_url, rows = entry["path"], entry["rows"]
+        limit = max(1, MAX_BOOTSTRAP_POSITIONS // max(rows, 1))
+        replicates = st.number_input("🔁 Number of replicates:", min_value=1, max_value=limit, value=min(100, limit),
+                                     help=f"At most {MAX_BOOTSTRAP_POSITIONS:,} drawn rows in all, so {limit:,} "
+                                          f"replicates of this dataset's {rows:,} rows.")
+        if st.button("📦 Generate Bootstrap Archive"):
+            if not fields:
+                st.warning("⚠️ Please select at least one field.")
+                return
+            boot = bootstrap_replicates(load_dataset(dataset_url, fields), replicates, seeded_rng(seed))
+            stem = os.path.splitext(os.path.basename(dataset_url))[0]
+            output_path = session_output_path(f"{stem}_bootstrap", ".zip")
+            write_bootstrap_archive(boot, output_path, {"source": dataset_url, "sha256": file_digest(dataset_url), "seed": seed})
+            st.success(f"✅ Wrote {replicates:,} replicates of {len(boot.data):,} rows to `{output_path}`.")
+            file_download_button(output_path, "⬇️ Download Bootstrap Archive", mime="application/zip")
+
+# Parsed Trimmer uploads are shared by every session, keyed by the SHA-256 of their bytes.
+# The least recently used ones are dropped once they hold more than UPLOAD_CACHE_BYTES;
+# uploads over UPLOAD_CACHE_MAX_FILE_BYTES are not kept and are streamed with
+# reservoir_sample_csv() instead.
+UPLOAD_CACHE_BYTES = 512 * 2**20
+UPLOAD_CACHE_MAX_FILE_BYTES = 64 * 2**20
+
+class UploadCache:
+    """A thread-safe LRU of parsed uploads (content hash -> DataFrame), bounded in bytes."""
+
+    def __init__(self, max_bytes=UPLOAD_CACHE_BYTES):
+        self.max_bytes = max_bytes
+        self.frames = OrderedDict()
+        self.lock = threading.Lock()
+
+    def get(self, digest):
+        with self.lock:
+            if digest not in self.frames:
+                return None
+            self.frames.move_to_end(digest)
+            return self.frames[digest][0]
+
+    def put(self, digest, frame):
+        size = int(frame.memory_usage(deep=True).sum())
+        with self.lock:
+            self.frames[digest] = (frame, size)
+            self.frames.move_to_end(digest)
+            while len(self.frames) > 1 and sum(size for _, size in self.frames.values()) > self.max_bytes:
+                self.frames.popitem(last=False)
+
+@st.cache_resource(show_spinner=False)
+def upload_cache():
+    return UploadCache()
+
+def upload_digest(uploaded_file):
+    """SHA-256 of an upload's bytes, hashed once per upload in each session."""
+    digests = st.session_state.setdefault("upload_digests", {})
+    if uploaded_file.file_id not in digests:
+        digests[uploaded_file.file_id] = hashlib.sha256(uploaded_file.getbuffer()).hexdigest()
+    return digests[uploaded_file.file_id]
+
+def parsed_upload(uploaded_file):
+    """The upload parsed into a DataFrame, reused across reruns and sessions by content hash.
+
+    Returns None for uploads over UPLOAD_CACHE_MAX_FILE_BYTES, which are streamed instead.
+    Parse errors are raised as by pd.read_csv().
+    """
+    if uploaded_file.size > UPLOAD_CACHE_MAX_FILE_BYTES:
+        return None
+    cache = upload_cache()
+    digest = upload_digest(uploaded_file)
+    dataset = cache.get(digest)
+    if dataset is None:
+        try:
+            dataset = pd.read_csv(uploaded_file)
+        finally:
+            uploaded_file.seek(0)
+        cache.put(digest, dataset)
+    return dataset
+
+# Custom dataset grid: the values are kept as one block in the session, edited in a single grid
+CUSTOM_MAX_FIELDS = 10
+CUSTOM_MAX_ROWS = 100_000
+
+def resize_grid(grid, field_names, num_rows):
+    """grid reshaped to num_rows rows of field_names, keeping existing cell values by position."""
+    values = np.empty((0, 0), dtype=object) if grid is None else grid.to_numpy(dtype=object)
+    resized = np.full((num_rows, len(field_names)), "", dtype=object)
+    rows, columns = min(num_rows, values.shape[0]), min(len(field_names), values.shape[1])
+    resized[:rows, :columns] = values[:rows, :columns]
+    return pd.DataFrame(resized, columns=field_names)
+
+def custom_grid(field_names, num_rows):
+    """The grid shown for field_names and num_rows, with an editor key that changes when it is rebuilt.
+
+    The grid is only rebuilt (from the latest edits) when the fields or the row count change,
+    so edits are not applied twice and reruns do not copy the cells.
+    """
+    grid = st.session_state.get("custom_grid")
+    if grid is None or list(grid.columns) != field_names or len(grid) != num_rows:
+        grid = resize_grid(st.session_state.get("custom_grid_values", grid), field_names, num_rows)
+        st.session_state["custom_grid"] = grid
+        st.session_state["custom_grid_version"] = st.session_state.get("custom_grid_version", 0) + 1
+    return grid, f"custom_grid_{st.session_state['custom_grid_version']}"
+
+def read_bulk_values(source, header):
+    """Rows of values from a CSV upload or pasted text (tab-separated when pasted from a spreadsheet)."""
+    if isinstance(source, str):
+        sep = "\t" if "\t" in source else ","
+        source = io.StringIO(source)
+    else:
+        sep = ","
+    return pd.read_csv(source, sep=sep, header=0 if header else None, dtype=str, keep_default_na=False)
+
+def load_bulk_values():
+    """Fill the grid (and, from a header row, the field names) from the pasted or uploaded values."""
+    upload = st.session_state.get("custom_bulk_file")
+    text = st.session_state.get("custom_bulk_text", "")
+    header = st.session_state.get("custom_bulk_header", False)
+    st.session_state["custom_bulk_error"] = None
+    if upload is None and not text.strip():
+        st.session_state["custom_bulk_error"] = "Paste some values or upload a CSV file first."
+        return
+    try:
+        values = read_bulk_values(upload if upload is not None else text, header)
+    except (ValueError, pd.errors.ParserError) as error:
+        st.session_state["custom_bulk_error"] = f"The values could not be read: {error}"
+        return
+    finally:
+        if upload is not None:
+            upload.seek(0)
+    values = values.iloc[:CUSTOM_MAX_ROWS, :CUSTOM_MAX_FIELDS]
+    if values.empty:
+        st.session_state["custom_bulk_error"] = "No values were found."
+        return
+    # Widget values can only be set before the widgets are created, which is when callbacks run
+    st.session_state["custom_num_fields"] = values.shape[1]
+    st.session_state["custom_num_rows"] = values.shape[0]
+    if header:
+        for i, name in enumerate(values.columns):
+            st.session_state[f"field_name_{i}"] = str(name)
+    st.session_state["custom_grid_values"] = values
+    st.session_state.pop("custom_grid", None)
+
+def _spec_key(i, kind, param):
+    return f"spec_{i}_{kind}_{param}"
+
+def _spec_widget_value(kind, param, value):
+    """A spec parameter as held by its widget: lists as comma-separated text, dates as dates."""
+    if kind == "category":
+        return "" if value is None else ", ".join(str(item) for item in value)
+    if kind == "date":
+        return datetime.date.fromisoformat(str(value))
+    if kind == "integer" and param in ("low", "high"):
+        return int(value)
+    if kind == "float" and param in ("low", "high"):
+        return float(value)
+    if param == "decimals":
+        return int(value)
+    if kind == "sequence" and param in ("start", "step") and not float(value).is_integer():
+        return float(value)
+    return value
+
+def field_spec_editor(i, name):
+    """Widgets for the spec of field i; returns the spec they describe."""
+    kind = st.selectbox(f"🧮 Rule for {name}", list(FIELD_SPEC_DEFAULTS), key=f"spec_{i}_type")
+    for param, value in FIELD_SPEC_DEFAULTS[kind].items():
+        st.session_state.setdefault(_spec_key(i, kind, param), _spec_widget_value(kind, param, value))
+    key = lambda param: _spec_key(i, kind, param)
+    spec = {"name": name, "type": kind}
+    columns = st.columns(4)
+
+    if kind in ("integer", "float"):
+        spec["low"] = columns[0].number_input("Low", key=key("low"))
+        spec["high"] = columns[1].number_input("High", key=key("high"))
+        spec["distribution"] = columns[2].selectbox("Distribution", SPEC_DISTRIBUTIONS, key=key("distribution"))
+        if kind == "float":
+            spec["decimals"] = columns[3].number_input("Decimals", min_value=0, max_value=10, key=key("decimals"))
+    elif kind == "category":
+        values = columns[0].text_input("Values (comma-separated)", key=key("values"))
+        weights = columns[1].text_input("Weights (optional)", key=key("weights"))
+        spec["values"] = [value.strip() for value in values.split(",") if value.strip()]
+        try:
+            spec["weights"] = [float(weight) for weight in weights.split(",") if weight.strip()] or None
+        except ValueError:
+            spec["weights"] = weights
+    elif kind == "date":
+        spec["start"] = columns[0].date_input("Start", key=key("start")).isoformat()
+        spec["end"] = columns[1].date_input("End", key=key("end")).isoformat()
+    elif kind == "sequence":
+        spec["start"] = columns[0].number_input("Start", key=key("start"))
+        spec["step"] = columns[1].number_input("Step", key=key("step"))
+        spec["prefix"] = columns[2].text_input("Prefix", key=key("prefix"))
+    else:
+        spec["template"] = columns[0].text_input("Pattern", key=key("template"),
+                                                 help="9 = digit, A = upper-case letter, a = lower-case letter, "
+                                                      "{x|y} = one of the options, \\ = a literal character.")
+    return spec
+
+def load_spec_file():
+    """Set the field names and spec widgets from an uploaded spec file."""
+    upload = st.session_state.get("spec_file")
+    st.session_state["spec_file_error"] = None
+    if upload is None:
+        st.session_state["spec_file_error"] = "Upload a spec file first."
+        return
+    try:
+        specs = specs_from_json(upload.getvalue().decode("utf-8"))[:CUSTOM_MAX_FIELDS]
+    except (ValueError, UnicodeDecodeError) as error:
+        st.session_state["spec_file_error"] = f"The spec file could not be loaded: {error}"
+        return
+    # Widget values can only be set before the widgets are created, which is when callbacks run
+    st.session_state["custom_num_fields"] = max(len(specs), 1)
+    for i, spec in enumerate(specs):
+        st.session_state[f"field_name_{i}"] = str(spec["name"])
+        st.session_state[f"spec_{i}_type"] = spec["type"]
+        for param, value in {**FIELD_SPEC_DEFAULTS[spec["type"]], **spec}.items():
+            if param in FIELD_SPEC_DEFAULTS[spec["type"]]:
+                st.session_state[_spec_key(i, spec["type"], param)] = _spec_widget_value(spec["type"], param, value)
+
 # Sidebar Navigation with Emojis
 page = st.sidebar.radio(
     "**Select a Page**", 
@@ -36,11 +372,16 @@ if page == "🏠 Home Page":
     st.header("🤖 Automatic Dataset Generator Page")
     st.write("This page enables you to generate datasets based on your original dataset. You can select fields from "
              "your dataset, specify the number of rows (up to 500), and generate a dataset with randomly sampled values. "
-             "You can also download the generated dataset.")
+             "You can also download the generated dataset. For millions of rows, the large-scale export mode streams "
+             "the generated rows straight to a file, either resampled from your dataset or drawn as new synthetic rows "
+             "from distributions fitted to each field.")
     
     st.header("🛠️ Custom Dataset Generator Page")
     st.write("On this page, you can customize your dataset by specifying the number of fields, field names, and values. "
-             "You can generate a dataset with a maximum of 10 fields and 50 rows. After generating the dataset, "
+             "Values are entered in a single grid, or pasted/uploaded in bulk, for up to 10 fields and 100,000 rows. "
+             "Alternatively, each field can follow a rule (a number range, weighted categories, dates, a sequence "
+             "or a pattern) to generate millions of rows; rules can be saved and loaded as JSON. "
+             "After generating the dataset, "
              "you can download it.")
 
     st.header("📊 Dataset for Classification (ML) Page")
@@ -63,7 +404,8 @@ if page == "🏠 Home Page":
 
     st.header("✂️ Dataset Trimmer Page")
     st.write("This page enables you to upload your own dataset. "
-             "Each dataset uploaded here is enabled for modification of its shape. "
+             "Each dataset uploaded here is enabled for modification of its shape, whatever its size: "
+             "it is read in chunks and sampled in a single pass. "
              "At last, you can download your modified dataset.")
     
     # Additional Tips with Emojis
@@ -85,7 +427,7 @@ if page == "🏠 Home Page":
     """)
     
     st.markdown("""
-    5. **⬇️ Download in CSV Format**: When you're satisfied with the generated dataset, click the 'Download Dataset' button to download it in CSV format using base64 encoding.
+    5. **⬇️ Download in CSV Format**: When you're satisfied with the generated dataset, click the 'Download' button to download it in CSV format. The file is only generated when you click.
     """)
 
     st.write("🌟 To get started, use the sidebar navigation to access the respective pages.")
@@ -94,123 +436,255 @@ if page == "🏠 Home Page":
 if page == "🤖 Automatic Dataset Generator":
     st.header("🤖 Automatic Dataset Generator Page")
     
-    # Load your original dataset
-    original_dataset = pd.read_csv("data.csv")  
-    
-    # Input fields
+    # Input fields (only the column names of the original dataset are needed here)
     st.write("📋 **Select the fields you want to include in the generated dataset:**")
-    selected_fields = st.multiselect("Select field names", original_dataset.columns)
+    selected_fields = st.multiselect("Select field names", dataset_columns("data.csv"))
     
-    # Input number of rows (max 500)
-    st.write("🔢 **Specify the number of rows (max 500):**")
-    num_rows = st.number_input("Enter the number of rows", min_value=1, max_value=500)
+    # Generation mode: an in-page preview, or a large export streamed straight to a file. Large
+    # exports either resample existing rows or draw new ones from per-column distributions.
+    mode = st.radio("🛠️ Select the generation mode:", ("👀 Preview (up to 500 rows)", "🏭 Large-scale export (streamed to a file)",
+                                                       "🧪 Synthetic rows (distribution-fitted, streamed to a file)"))
     
-    # Generate the dataset
-    if st.button("✨ Generate Automatic Dataset"):
-        if not selected_fields:
-            st.warning("⚠️ Please select at least one field.")
-        else:
-            # Randomly sample rows from the original dataset
-            generated_df = original_dataset[selected_fields].sample(n=num_rows, replace=True)
-            st.subheader("📊 Generated Dataset:")
-            st.dataframe(generated_df)
+    if mode == "👀 Preview (up to 500 rows)":
+        # Input number of rows (max 500)
+        st.write("🔢 **Specify the number of rows (max 500):**")
+        num_rows = st.number_input("Enter the number of rows", min_value=1, max_value=500)
+        seed = st.number_input("🌱 Random seed (the same seed, fields and rows give the same dataset):", min_value=0, value=0, step=1)
     
-            # Download the dataset using st.button and base64
-            csv = generated_df.to_csv(index=False)
-            b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-            href = f'data:file/csv;base64,{b64}'
-            st.markdown(f'⬇️ [Click here to download Generated Dataset](data:file/csv;base64,{b64})', unsafe_allow_html=True)
+        # Generate the dataset
+        if st.button("✨ Generate Automatic Dataset"):
+            if not selected_fields:
+                st.warning("⚠️ Please select at least one field.")
+            else:
+                # Randomly sample rows from the original dataset
+                generated_df = sample_dataset("data.csv", selected_fields, num_rows, seed)
+                st.subheader("📊 Generated Dataset:")
+                st.dataframe(generated_df)
+    
+                # Download the dataset: the CSV is only written when the button is clicked
+                csv_download_button(generated_df, "⬇️ Download Generated Dataset")
             
-            # Dataset Overview
-            st.header("📈 Dataset Overview")
+                # Dataset Overview
+                st.header("📈 Dataset Overview")
             
-            # Dataset Shape
-            st.subheader("🔍 Dataset Shape:")
-            st.write(generated_df.shape)
+                # Dataset Shape
+                st.subheader("🔍 Dataset Shape:")
+                st.write(generated_df.shape)
     
-            # Column Names
-            st.subheader("📑 Column Names:")
-            st.write(generated_df.columns)
+                # Column Names
+                st.subheader("📑 Column Names:")
+                st.write(generated_df.columns)
     
-            # Data Types
-            st.subheader("🧬 Data Types:")
-            st.write(generated_df.dtypes)
+                # Data Types
+                st.subheader("🧬 Data Types:")
+                st.write(generated_df.dtypes)
     
-            # Summary Statistics
-            st.subheader("📐 Summary Statistics:")
-            st.write(generated_df.describe())
+                # Summary Statistics
+                st.subheader("📐 Summary Statistics:")
+                st.write(summarize(generated_df))
+    
+    else:
+        synthetic = mode.startswith("🧪")
+        if synthetic:
+            st.info("ℹ️ Each field is sampled independently from the distribution fitted to the original dataset, "
+                    "so the generated rows are new combinations rather than copies of existing rows.")
+            
+            # Phone, Email, Alphanumeric and Address are built from templates: inferred from the
+            # original dataset unless the user enters one
+            templates = {}
+            template_fields = [field for field in selected_fields if SYNTHETIC_FIELD_KINDS.get(field) == "template"]
+            if template_fields:
+                st.write("🧩 **Templates for generated values (leave empty to infer the format from the original dataset):**")
+                st.caption("9 = digit, A = uppercase letter, a = lowercase letter, {x|y} = one of the options, "
+                           "\\ = use the next character as is. Any other character is copied as written.")
+                examples = {"Phone": "(999) 999-9999", "Email": "aaaaaaa@{aol|gmail}.{com|org}",
+                            "Alphanumeric": "AAA99AAA9AA", "Address": "9999 Aaaaaa {St.|Rd.|Ave}"}
+                for field in template_fields:
+                    templates[field] = st.text_input(f"🧩 Template for {field}", key=f"template_{field}",
+                                                     placeholder=f"e.g. {examples.get(field, '')}")
+        
+        # Input number of rows (no limit: memory is bounded by the chunk size)
+        st.write("🔢 **Specify the number of rows:**")
+        num_rows = st.number_input("Enter the number of rows", min_value=1, value=1_000_000, step=100_000)
+        file_name = st.text_input("💾 Output file name", value="synthetic_dataset.csv" if synthetic else "automatic_dataset.csv")
+        seed = st.number_input("🌱 Random seed (the same seed, fields and rows give the same dataset):", min_value=0, value=0, step=1)
+        workers = st.number_input("⚡ Worker processes", min_value=1, max_value=max(os.cpu_count() or 1, 1), value=1,
+                                  help="With more than one, the rows are written in parallel as shards of "
+                                       f"{SHARD_ROWS:,} rows (one file each) listed in a manifest file.")
+        
+        if st.button("🏭 Generate Large Dataset"):
+            if not selected_fields:
+                st.warning("⚠️ Please select at least one field.")
+            elif not file_name.strip():
+                st.warning("⚠️ Please enter an output file name.")
+            else:
+                model = None
+                if synthetic:
+                    model = dict(fit_synthetic_model("data.csv"))
+                    try:
+                        for field, template in templates.items():
+                            if template.strip():
+                                model[field] = parse_template(template.strip())
+                    except ValueError as error:
+                        st.error(f"❌ Invalid template for {field}: {error}")
+                        st.stop()
+                
+                output_path = session_output_path(file_name)
+                progress = st.progress(0.0, text="🏭 Generating...")
+                report = lambda done: progress.progress(done / num_rows, text=f"🏭 {done:,} / {num_rows:,} rows")
+                summary = StreamingSummary()
+                source = model if synthetic else load_dataset("data.csv", selected_fields)
+                if workers > 1:
+                    manifest_path = generate_sharded("synthetic" if synthetic else "resample", source, selected_fields, num_rows,
+                                                     output_path, seed=seed, workers=workers, progress=report, summary=summary)
+                elif synthetic:
+                    stream_synthetic_to_csv(source, selected_fields, num_rows, output_path, seed, progress=report, summary=summary)
+                else:
+                    stream_resample_to_csv(source, selected_fields, num_rows, output_path, seed, progress=report, summary=summary)
+                progress.empty()
+                
+                if workers > 1:
+                    shard_files, _ = shard_paths(output_path, len(shard_plan(num_rows)))
+                    total_bytes = sum(os.path.getsize(path) for path in shard_files)
+                    st.success(f"✅ Wrote {num_rows:,} rows ({total_bytes / 2**20:,.1f} MB) as {len(shard_files):,} shard files "
+                               f"listed in `{manifest_path}`.")
+                    output_path = shard_files[0]
+                else:
+                    st.success(f"✅ Wrote {num_rows:,} rows ({os.path.getsize(output_path) / 2**20:,.1f} MB) to `{output_path}`.")
+                st.subheader("📊 Preview (first 100 rows):")
+                st.dataframe(pd.read_csv(output_path, nrows=100))
+                st.subheader("📐 Summary Statistics (all rows):")
+                st.write(summary.describe())
+                if workers > 1:
+                    file_download_button(manifest_path, "⬇️ Download Shard Manifest", mime="application/json")
+                else:
+                    file_download_button(output_path, "⬇️ Download Generated Dataset")
 
 # Page 3: Manual Dataset Generator
 elif page == "🛠️ Custom Dataset Generator":
     st.header("🛠️ Custom Dataset Generator Page")
 
+    entry_mode = st.radio("🧭 How should the values be filled in?",
+                          ("✏️ Enter the values by hand", "🧮 Generate the values from rules"), horizontal=True)
+
     # Input number of fields (max 10)
     st.write("📋 **Enter the number of fields (max 10):**")
-    num_fields = st.number_input("Enter the number of fields", min_value=1, max_value=10)
+    num_fields = st.number_input("Enter the number of fields", min_value=1, max_value=CUSTOM_MAX_FIELDS, key="custom_num_fields")
 
     # Instructions
     st.markdown("⚠️ **Please note the following:**")
     st.markdown("1. 🖊️ The field name can be changed by yourself from the default field name.")
     st.markdown("2. 🔤 The field name entered must be of character data type.")
+    st.markdown("3. 📋 Values are typed straight into the grid below, or pasted/uploaded in bulk; "
+                "with rules, each field is generated from a range, a list of categories, dates, a sequence or a pattern.")
 
     # Initialize an empty list to store field names
     field_names = []
 
     # Collect field names one by one with unique keys and validate data type
     for i in range(num_fields):
-        default_field_name = f"Field Name {i + 1}"
-        field_name = st.text_input(f"🔤 Enter Field Name {i + 1}", key=f"field_name_{i}", value=default_field_name)
+        st.session_state.setdefault(f"field_name_{i}", f"Field Name {i + 1}")
+        field_name = st.text_input(f"🔤 Enter Field Name {i + 1}", key=f"field_name_{i}")
         if not isinstance(field_name, str):
             st.error("🚫 Field names must be of string data type. Please enter a valid field name.")
             break
         field_names.append(field_name)
+    # Repeated names would hold a single column, as before
+    field_names = list(dict.fromkeys(field_names))
 
     st.write("📝 **Field Names:**")
     st.write(field_names)
-    
-    # Input the number of rows
-    st.write("🔢 **Enter the number of rows (max 500):**")
-    num_rows = st.number_input("Enter the number of rows", min_value=1, max_value=500)
-
-    # Collect field values for each row with unique keys
-    field_values = {field_name: [] for field_name in field_names}
-    for i in range(num_rows):
-        st.write(f"📄 **Record {i + 1}:**")
-        for field_name in field_names:
-            field_value = st.text_input(f"✏️ Enter the value for {field_name} in Record {i + 1}", key=f"value_{i}_{field_name}")
-            field_values[field_name].append(field_value)
-
-    # Generate the dataset
-    if st.button("✨ Generate Dataset"):
-        data = {field_name: field_values[field_name] for field_name in field_names}
-        generated_df = pd.DataFrame(data)
-        st.subheader("📊 Generated Dataset:")
-        st.dataframe(generated_df)
-
-        # Download the dataset using st.button and base64
-        csv = generated_df.to_csv(index=False)
-        b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-        href = f'data:file/csv;base64,{b64}'
-        st.markdown(f'⬇️ [Click here to download Generated Dataset](data:file/csv;base64,{b64})', unsafe_allow_html=True)
-        
-        # Dataset Overview
-        st.header("📈 Dataset Overview")
-        
-        # Dataset Shape
-        st.subheader("🔍 Dataset Shape:")
-        st.write(generated_df.shape)
-
-        # Column Names
-        st.subheader("📑 Column Names:")
-        st.write(generated_df.columns)
-
-        # Data Types
-        st.subheader("🧬 Data Types:")
-        st.write(generated_df.dtypes)
-
-        # Summary Statistics
-        st.subheader("📐 Summary Statistics:")
-        st.write(generated_df.describe())
+
+    if entry_mode.startswith("🧮"):
+        # Rule-based generation: each field follows a spec and rows are generated in vectorized chunks
+        with st.expander("📂 Load rules from a JSON file"):
+            st.file_uploader("Upload a rules file:", type=["json"], key="spec_file")
+            st.button("📥 Load the rules", on_click=load_spec_file)
+            if st.session_state.get("spec_file_error"):
+                st.error(f"❌ {st.session_state['spec_file_error']}")
+
+        st.write("🧮 **Choose a rule for each field:**")
+        specs = [field_spec_editor(i, field_name) for i, field_name in enumerate(field_names)]
+        st.download_button("💾 Save the rules as JSON", data=specs_to_json(specs), file_name="dataset_rules.json",
+                           mime="application/json", on_click="ignore")
+
+        st.write("🔢 **Enter the number of rows:**")
+        num_rows = st.number_input("Enter the number of rows", min_value=1, value=100_000, step=100_000, key="spec_num_rows")
+        file_name = st.text_input("💾 Output file name", value="custom_dataset.csv", key="spec_output_name")
+        seed = st.number_input("🌱 Random seed (the same seed, fields and rows give the same dataset):", min_value=0, value=0, step=1, key="spec_seed")
+
+        if st.button("✨ Generate Dataset from Rules"):
+            try:
+                models = compile_field_specs(specs)
+            except ValueError as error:
+                st.error(f"❌ Invalid rule for {error}")
+                st.stop()
+            if not file_name.strip():
+                st.warning("⚠️ Please enter an output file name.")
+                st.stop()
+
+            output_path = session_output_path(file_name)
+            progress = st.progress(0.0, text="🏭 Generating...")
+            report = lambda done: progress.progress(done / num_rows, text=f"🏭 {done:,} / {num_rows:,} rows")
+            summary = StreamingSummary()
+            stream_synthetic_to_csv(models, field_names, num_rows, output_path, seed, progress=report, summary=summary)
+            progress.empty()
+
+            st.success(f"✅ Wrote {num_rows:,} rows ({os.path.getsize(output_path) / 2**20:,.1f} MB) to `{output_path}`.")
+            st.subheader("📊 Preview (first 100 rows):")
+            st.dataframe(pd.read_csv(output_path, nrows=100))
+            st.subheader("📐 Summary Statistics (all rows):")
+            st.write(summary.describe())
+            file_download_button(output_path, "⬇️ Download Generated Dataset")
+
+    else:
+        # Input the number of rows
+        st.write(f"🔢 **Enter the number of rows (max {CUSTOM_MAX_ROWS:,}):**")
+        num_rows = st.number_input("Enter the number of rows", min_value=1, max_value=CUSTOM_MAX_ROWS, key="custom_num_rows")
+
+        # Bulk entry: values pasted from a spreadsheet or a CSV file replace the grid's contents
+        with st.expander("📋 Paste or upload values in bulk"):
+            st.text_area("Paste rows of values (copied from a spreadsheet, or comma-separated):", key="custom_bulk_text")
+            st.file_uploader("...or upload a CSV file:", type=["csv"], key="custom_bulk_file")
+            st.checkbox("🔤 The first row holds the field names", key="custom_bulk_header")
+            st.button("📥 Load into the grid", on_click=load_bulk_values)
+            if st.session_state.get("custom_bulk_error"):
+                st.error(f"❌ {st.session_state['custom_bulk_error']}")
+
+        # Collect field values in a single grid: one widget whatever the number of cells
+        st.write("✏️ **Enter the values of each record:**")
+        grid, editor_key = custom_grid(field_names, num_rows)
+        edited_grid = st.data_editor(grid, key=editor_key, num_rows="fixed", width="stretch",
+                                     column_config={field_name: st.column_config.TextColumn() for field_name in field_names})
+        st.session_state["custom_grid_values"] = edited_grid
+
+        # Generate the dataset
+        if st.button("✨ Generate Dataset"):
+            generated_df = edited_grid.fillna("")
+            st.subheader("📊 Generated Dataset:")
+            st.dataframe(generated_df)
+
+            # Download the dataset: the CSV is only written when the button is clicked
+            csv_download_button(generated_df, "⬇️ Download Generated Dataset")
+        
+            # Dataset Overview
+            st.header("📈 Dataset Overview")
+        
+            # Dataset Shape
+            st.subheader("🔍 Dataset Shape:")
+            st.write(generated_df.shape)
+
+            # Column Names
+            st.subheader("📑 Column Names:")
+            st.write(generated_df.columns)
+
+            # Data Types
+            st.subheader("🧬 Data Types:")
+            st.write(generated_df.dtypes)
+
+            # Summary Statistics
+            st.subheader("📐 Summary Statistics:")
+            st.write(summarize(generated_df))
 
 elif page == "📊 Dataset for Classification (ML)":
     st.header("Dataset for Classification (ML) Page 📊")
@@ -219,478 +693,598 @@ elif page == "📊 Dataset for Classification (ML)":
     output_type = st.radio("🔄 Select the type of output:", ("Binary Class", "Multi-Class"))
 
     if output_type == "Binary Class":
-        # Select binary classification dataset
-        selected_dataset = st.selectbox("📂 Select a binary classification dataset:", ("Heart Disease Dataset 🫀", "Diabetes Dataset 🩸"))
-
-        # Define dataset paths (replace with actual dataset paths)
-        dataset_paths = {
-            "Heart Disease Dataset 🫀": "Datasets for ML/Classification/heart_disease_data.csv",
-            "Diabetes Dataset 🩸": "Datasets for ML/Classification/diabetes_data.csv",
-        }
+        # Select binary classification dataset (listed from the catalog manifest)
+        datasets = catalog_datasets("Classification", max_classes=2)
+        if not datasets:
+            st.warning("⚠️ No datasets of this kind were found in the catalog.")
+            st.stop()
+        selected_dataset = st.selectbox("📂 Select a binary classification dataset:", list(datasets))
 
         option = st.radio("🛠️ Select dataset generation option:", ("📋 Entire Dataset", "🎲 Random Number of Rows with selected Fields"))
         
         if option == "📋 Entire Dataset":
             # Display the entire dataset
             if st.button("✨ Generate Dataset"):
-                dataset_url = dataset_paths[selected_dataset]
+                dataset_url = datasets[selected_dataset]["path"]
         
                 # Load and display the selected dataset
-                dataset = pd.read_csv(dataset_url)
+                dataset = load_dataset(dataset_url)
                 
                 st.subheader("📑 Generated Dataset:")
                 st.dataframe(dataset)
     
-                # Download the dataset using base64 encoding
-                csv = dataset.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                href = f'data:file/csv;base64,{b64}'
-                st.markdown(f'<a href="{href}" download="generated_dataset.csv">📥 Click here to download Generated Dataset</a>', unsafe_allow_html=True)
+                # Download the dataset: the CSV is only written when the button is clicked
+                csv_download_button(dataset, "📥 Download Generated Dataset")
     
+                # The overview of a catalog dataset is precomputed and stored in the manifest
+                overview = dataset_overview(datasets[selected_dataset])
                 st.header("🔍 Dataset Overview")
                 
                 # Dataset Shape
                 st.subheader("📏 Dataset Shape:")
-                st.write(dataset.shape)
+                st.write(overview["shape"])
         
                 # Column Names
                 st.subheader("🔤 Column Names:")
-                st.write(dataset.columns)
+                st.write(overview["columns"])
         
                 # Data Types
                 st.subheader("📂 Data Types:")
-                st.write(dataset.dtypes)
+                st.write(overview["dtypes"])
         
                 # Summary Statistics
                 st.subheader("📊 Summary Statistics:")
-                st.write(dataset.describe())
+                st.write(overview["describe"])
                 
                 # Data Head
                 st.subheader("🔝 Data Head:")
-                st.write(dataset.head())
+                st.write(overview["head"])
         
                 # Data Tail
                 st.subheader("🔚 Data Tail:")
-                st.write(dataset.tail())
+                st.write(overview["tail"])
             
         else:
-            dataset_url = dataset_paths[selected_dataset]
+            dataset_url = datasets[selected_dataset]["path"]
     
-            # Load and display the selected dataset
-            dataset = pd.read_csv(dataset_url)
+            # The field list comes from the catalog manifest; no data is read until a sample is generated
+            columns = datasets[selected_dataset]["columns"]
         
             st.write("✅ Select the fields you want to include in the generated dataset:")
-            selected_fields = st.multiselect("📑 Select field names", dataset.columns)
+            selected_fields = st.multiselect("📑 Select field names", columns)
             
             # Generate random number of rows up to 500
             num_rows = st.number_input("🎲 Select the number of rows (1-500):", min_value=1, max_value=500, value=10)
-            random_rows = dataset[selected_fields].sample(n=num_rows, replace=True)
+            seed = st.number_input("🌱 Random seed (the same seed, fields and rows give the same dataset):", min_value=0, value=0, step=1)
+            label_column = datasets[selected_dataset]["label_column"]
+            sampling = None
+            if label_column is not None:
+                # Stratified and balanced samples keep minority classes that random rows can miss
+                sampling_mode = st.radio("🎯 Sampling:", list(SAMPLING_MODES), horizontal=True,
+                                         help=f"Classes are taken from the `{label_column}` column.")
+                if SAMPLING_MODES[sampling_mode] is not None:
+                    sampling = (SAMPLING_MODES[sampling_mode], label_column)
+            sample_key = (dataset_url, seed, tuple(selected_fields), num_rows, sampling)
     
             if st.button("✨ Generate Dataset"):
                 if not selected_fields:
                     st.warning("⚠️ Please select at least one field.")
                 else:
-                    st.subheader("📑 Generated Dataset:")
-                    st.dataframe(random_rows)
+                    # Sample only on the button's action; the result is reused across reruns
+                    st.session_state["active_sample"] = sample_key
             
-                    # Download the dataset using base64 encoding
-                    csv = random_rows.to_csv(index=False)
-                    b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                    href = f'data:file/csv;base64,{b64}'
-                    st.markdown(f'<a href="{href}" download="generated_dataset.csv">📥 Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-            
-                    st.header("🔍 Dataset Overview")
-                        
+            if selected_fields and st.session_state.get("active_sample") == sample_key:
+                random_rows = cached_sample(sample_key)
+                st.subheader("📑 Generated Dataset:")
+                st.dataframe(random_rows)
+        
+                # Download the dataset: the CSV is only written when the button is clicked
+                csv_download_button(random_rows, "📥 Download Generated Dataset")
+        
+                st.header("🔍 Dataset Overview")
+                
+                # The overview of a generated sample is only computed once the user opens it
+                if st.toggle("👀 Show the overview of the generated dataset"):
+                    overview = cached_sample_overview(sample_key)
+                    
                     # Dataset Shape
                     st.subheader("📏 Entire Dataset Shape:")
-                    st.write(dataset.shape)
-                    
+                    st.write((datasets[selected_dataset]["rows"], len(columns)))
+                
                     st.subheader("📏 Generated Dataset Shape:")
-                    st.write(random_rows.shape)
-            
+                    st.write(overview["shape"])
+        
                     # Column Names
                     st.subheader("🔤 Column Names:")
-                    st.write(random_rows.columns)
-            
+                    st.write(overview["columns"])
+        
                     # Data Types
                     st.subheader("📂 Data Types:")
-                    st.write(random_rows.dtypes)
-            
+                    st.write(overview["dtypes"])
+        
                     # Summary Statistics
                     st.subheader("📊 Summary Statistics:")
-                    st.write(random_rows.describe())
-                    
+                    st.write(overview["describe"])
+                
                     # Data Head
                     st.subheader("🔝 Data Head:")
-                    st.write(random_rows.head())
-            
+                    st.write(overview["head"])
+        
                     # Data Tail
                     st.subheader("🔚 Data Tail:")
-                    st.write(random_rows.tail())
+                    st.write(overview["tail"])
 
-    elif output_type == "Multi-Class":
-        # Select multi-class classification dataset
-        selected_dataset = st.selectbox("📂 Select a multi-class classification dataset:", ("Iris Dataset 🌸", "Acoustic Features Dataset 🎵"))
+            # Bootstrap replicates of the selected fields, for model evaluation
+            bootstrap_download(datasets[selected_dataset], selected_fields, seed)
 
-        # Define dataset paths (replace with actual dataset paths)
-        dataset_paths = {
-            "Iris Dataset 🌸": "Datasets for ML/Classification/iris_data.csv",
-            "Acoustic Features Dataset 🎵": "Datasets for ML/Classification/acoustic_features_data.csv",
-        }
+    elif output_type == "Multi-Class":
+        # Select multi-class classification dataset (listed from the catalog manifest)
+        datasets = catalog_datasets("Classification", min_classes=3)
+        if not datasets:
+            st.warning("⚠️ No datasets of this kind were found in the catalog.")
+            st.stop()
+        selected_dataset = st.selectbox("📂 Select a multi-class classification dataset:", list(datasets))
 
         option = st.radio("🛠️ Select dataset generation option:", ("📋 Entire Dataset", "🎲 Random Number of Rows with selected Fields"))
         
         if option == "📋 Entire Dataset":
             # Display the entire dataset
             if st.button("✨ Generate Dataset"):
-                dataset_url = dataset_paths[selected_dataset]
+                dataset_url = datasets[selected_dataset]["path"]
         
                 # Load and display the selected dataset
-                dataset = pd.read_csv(dataset_url)
+                dataset = load_dataset(dataset_url)
                 
                 st.subheader("📑 Generated Dataset:")
                 st.dataframe(dataset)
     
-                # Download the dataset using base64 encoding
-                csv = dataset.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                href = f'data:file/csv;base64,{b64}'
-                st.markdown(f'<a href="{href}" download="generated_dataset.csv">📥 Click here to download Generated Dataset</a>', unsafe_allow_html=True)
+                # Download the dataset: the CSV is only written when the button is clicked
+                csv_download_button(dataset, "📥 Download Generated Dataset")
     
+                # The overview of a catalog dataset is precomputed and stored in the manifest
+                overview = dataset_overview(datasets[selected_dataset])
                 st.header("🔍 Dataset Overview")
                 
                 # Dataset Shape
                 st.subheader("📏 Dataset Shape:")
-                st.write(dataset.shape)
+                st.write(overview["shape"])
         
                 # Column Names
                 st.subheader("🔤 Column Names:")
-                st.write(dataset.columns)
+                st.write(overview["columns"])
         
                 # Data Types
                 st.subheader("📂 Data Types:")
-                st.write(dataset.dtypes)
+                st.write(overview["dtypes"])
         
                 # Summary Statistics
                 st.subheader("📊 Summary Statistics:")
-                st.write(dataset.describe())
+                st.write(overview["describe"])
                 
                 # Data Head
                 st.subheader("🔝 Data Head:")
-                st.write(dataset.head())
+                st.write(overview["head"])
         
                 # Data Tail
                 st.subheader("🔚 Data Tail:")
-                st.write(dataset.tail())
+                st.write(overview["tail"])
             
         else:
-            dataset_url = dataset_paths[selected_dataset]
+            dataset_url = datasets[selected_dataset]["path"]
     
-            # Load and display the selected dataset
-            dataset = pd.read_csv(dataset_url)
+            # The field list comes from the catalog manifest; no data is read until a sample is generated
+            columns = datasets[selected_dataset]["columns"]
         
             st.write("✅ Select the fields you want to include in the generated dataset:")
-            selected_fields = st.multiselect("📑 Select field names", dataset.columns)
+            selected_fields = st.multiselect("📑 Select field names", columns)
             
             # Generate random number of rows up to 500
             num_rows = st.number_input("🎲 Select the number of rows (1-500):", min_value=1, max_value=500, value=10)
-            random_rows = dataset[selected_fields].sample(n=num_rows, replace=True)
+            seed = st.number_input("🌱 Random seed (the same seed, fields and rows give the same dataset):", min_value=0, value=0, step=1)
+            label_column = datasets[selected_dataset]["label_column"]
+            sampling = None
+            if label_column is not None:
+                # Stratified and balanced samples keep minority classes that random rows can miss
+                sampling_mode = st.radio("🎯 Sampling:", list(SAMPLING_MODES), horizontal=True,
+                                         help=f"Classes are taken from the `{label_column}` column.")
+                if SAMPLING_MODES[sampling_mode] is not None:
+                    sampling = (SAMPLING_MODES[sampling_mode], label_column)
+            sample_key = (dataset_url, seed, tuple(selected_fields), num_rows, sampling)
     
             if st.button("✨ Generate Dataset"):
                 if not selected_fields:
                     st.warning("⚠️ Please select at least one field.")
                 else:
-                    st.subheader("📑 Generated Dataset:")
-                    st.dataframe(random_rows)
+                    # Sample only on the button's action; the result is reused across reruns
+                    st.session_state["active_sample"] = sample_key
             
-                    # Download the dataset using base64 encoding
-                    csv = random_rows.to_csv(index=False)
-                    b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                    href = f'data:file/csv;base64,{b64}'
-                    st.markdown(f'<a href="{href}" download="generated_dataset.csv">📥 Click here to download Generated Dataset</a>', unsafe_allow_html=True)
-            
-                    st.header("🔍 Dataset Overview")
-                        
+            if selected_fields and st.session_state.get("active_sample") == sample_key:
+                random_rows = cached_sample(sample_key)
+                st.subheader("📑 Generated Dataset:")
+                st.dataframe(random_rows)
+        
+                # Download the dataset: the CSV is only written when the button is clicked
+                csv_download_button(random_rows, "📥 Download Generated Dataset")
+        
+                st.header("🔍 Dataset Overview")
+                
+                # The overview of a generated sample is only computed once the user opens it
+                if st.toggle("👀 Show the overview of the generated dataset"):
+                    overview = cached_sample_overview(sample_key)
+                    
                     # Dataset Shape
                     st.subheader("📏 Entire Dataset Shape:")
-                    st.write(dataset.shape)
-                    
+                    st.write((datasets[selected_dataset]["rows"], len(columns)))
+                
                     st.subheader("📏 Generated Dataset Shape:")
-                    st.write(random_rows.shape)
-            
+                    st.write(overview["shape"])
+        
                     # Column Names
                     st.subheader("🔤 Column Names:")
-                    st.write(random_rows.columns)
-            
+                    st.write(overview["columns"])
+        
                     # Data Types
                     st.subheader("📂 Data Types:")
-                    st.write(random_rows.dtypes)
-            
+                    st.write(overview["dtypes"])
+        
                     # Summary Statistics
                     st.subheader("📊 Summary Statistics:")
-                    st.write(random_rows.describe())
-                    
+                    st.write(overview["describe"])
+                
                     # Data Head
                     st.subheader("🔝 Data Head:")
-                    st.write(random_rows.head())
-            
+                    st.write(overview["head"])
+        
                     # Data Tail
                     st.subheader("🔚 Data Tail:")
-                    st.write(random_rows.tail())
+                    st.write(overview["tail"])
+
+            # Bootstrap replicates of the selected fields, for model evaluation
+            bootstrap_download(datasets[selected_dataset], selected_fields, seed)
 
 # Page 5: Dataset for Regression (ML)
 elif page == "📈 Dataset for Regression (ML)":
     st.header("📊 Dataset for Regression (ML) Page")
 
-    # Select a regression dataset
-    selected_dataset = st.selectbox("🔍 Select a regression dataset:", 
-                                    ("🚗 Car Price Dataset", "⚡ Electricity Dataset", "🏠 House Price Dataset"))
-
-    dataset_paths = {
-        "🚗 Car Price Dataset": "Datasets for ML/Regression/car_price_data.csv",
-        "⚡ Electricity Dataset": "Datasets for ML/Regression/electricity_data.csv",
-        "🏠 House Price Dataset": "Datasets for ML/Regression/house_price_data.csv", 
-    }
+    # Select a regression dataset (listed from the catalog manifest)
+    datasets = catalog_datasets("Regression")
+    if not datasets:
+        st.warning("⚠️ No datasets of this kind were found in the catalog.")
+        st.stop()
+    selected_dataset = st.selectbox("🔍 Select a regression dataset:", list(datasets))
 
     option = st.radio("🎛️ Select a dataset generation option:", 
-                      ("📂 Entire Dataset", "🎲 Random Number of Rows with Selected Fields"))
+                      ("📂 Entire Dataset", "🎲 Random Number of Rows with Selected Fields",
+                       "🧬 New Correlated Rows (any number of rows)"))
         
     if option == "📂 Entire Dataset":
         # Display the entire dataset
         if st.button("✨ Generate Dataset"):
-            dataset_url = dataset_paths[selected_dataset]
+            dataset_url = datasets[selected_dataset]["path"]
     
             # Load and display the selected dataset
-            dataset = pd.read_csv(dataset_url)
+            dataset = load_dataset(dataset_url)
             
             st.subheader("📝 Generated Dataset:")
             st.dataframe(dataset)
 
-            # Download the dataset using base64 encoding
-            csv = dataset.to_csv(index=False)
-            b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-            href = f'data:file/csv;base64,{b64}'
-            st.markdown(f'<a href="{href}" download="generated_dataset.csv">📥 Click here to download the Generated Dataset</a>', 
-                        unsafe_allow_html=True)
+            # Download the dataset: the CSV is only written when the button is clicked
+            csv_download_button(dataset, "📥 Download the Generated Dataset")
 
+            # The overview of a catalog dataset is precomputed and stored in the manifest
+            overview = dataset_overview(datasets[selected_dataset])
             st.header("📊 Dataset Overview")
             
             # Dataset Shape
             st.subheader("📐 Dataset Shape:")
-            st.write(dataset.shape)
+            st.write(overview["shape"])
     
             # Column Names
             st.subheader("📋 Column Names:")
-            st.write(dataset.columns)
+            st.write(overview["columns"])
     
             # Data Types
             st.subheader("🔠 Data Types:")
-            st.write(dataset.dtypes)
+            st.write(overview["dtypes"])
     
             # Summary Statistics
             st.subheader("📈 Summary Statistics:")
-            st.write(dataset.describe())
+            st.write(overview["describe"])
             
             # Data Head
             st.subheader("🔝 Data Head:")
-            st.write(dataset.head())
+            st.write(overview["head"])
     
             # Data Tail
             st.subheader("🔚 Data Tail:")
-            st.write(dataset.tail())
+            st.write(overview["tail"])
+        
+    elif option == "🧬 New Correlated Rows (any number of rows)":
+        dataset_url = datasets[selected_dataset]["path"]
+        columns = datasets[selected_dataset]["columns"]
+        st.info("ℹ️ New rows keep the distribution of every field and the rank correlations between fields "
+                "(a Gaussian copula), so the target keeps its relationship with the features.")
+    
+        st.write("🛠️ Select the fields you want to include in the generated dataset:")
+        selected_fields = st.multiselect("📋 Select field names:", columns, default=columns)
+        
+        # Input number of rows (no limit: memory is bounded by the chunk size)
+        num_rows = st.number_input("🔢 Enter the number of rows:", min_value=1, value=100_000, step=100_000)
+        seed = st.number_input("🌱 Random seed (the same seed, fields and rows give the same dataset):", min_value=0, value=0, step=1)
+        file_name = st.text_input("💾 Output file name", value="regression_dataset.csv")
+    
+        if st.button("✨ Generate Dataset"):
+            if not selected_fields:
+                st.warning("⚠️ Please select at least one field.")
+            elif not file_name.strip():
+                st.warning("⚠️ Please enter an output file name.")
+            else:
+                # The marginals and correlations are cached per dataset, so only the sampling runs on later clicks
+                model = fit_copula_model(dataset_url)
+                output_path = session_output_path(file_name)
+                progress = st.progress(0.0, text="🏭 Generating...")
+                report = lambda done: progress.progress(done / num_rows, text=f"🏭 {done:,} / {num_rows:,} rows")
+                summary = StreamingSummary()
+                stream_copula_to_csv(model, selected_fields, num_rows, output_path, seed, progress=report, summary=summary)
+                progress.empty()
+    
+                st.success(f"✅ Wrote {num_rows:,} rows ({os.path.getsize(output_path) / 2**20:,.1f} MB) to `{output_path}`.")
+                st.subheader("📊 Preview (first 100 rows):")
+                st.dataframe(pd.read_csv(output_path, nrows=100))
+                st.subheader("📐 Summary Statistics (all rows):")
+                st.write(summary.describe())
+                file_download_button(output_path, "⬇️ Download Generated Dataset")
         
     else:
-        dataset_url = dataset_paths[selected_dataset]
+        dataset_url = datasets[selected_dataset]["path"]
 
-        # Load and display the selected dataset
-        dataset = pd.read_csv(dataset_url)
+        # The field list comes from the catalog manifest; no data is read until a sample is generated
+        columns = datasets[selected_dataset]["columns"]
     
         st.write("🛠️ Select the fields you want to include in the generated dataset:")
-        selected_fields = st.multiselect("📋 Select field names:", dataset.columns)
+        selected_fields = st.multiselect("📋 Select field names:", columns)
         
         # Generate a random number of rows up to 500
         num_rows = st.number_input("🔢 Select the number of rows (1-500):", min_value=1, max_value=500, value=10)
-        random_rows = dataset[selected_fields].sample(n=num_rows, replace=True)
+        seed = st.number_input("🌱 Random seed (the same seed, fields and rows give the same dataset):", min_value=0, value=0, step=1)
+        sample_key = (dataset_url, seed, tuple(selected_fields), num_rows, None)
 
         if st.button("✨ Generate Dataset"):
             if not selected_fields:
                 st.warning("⚠️ Please select at least one field.")
             else:
-                st.subheader("📝 Generated Dataset:")
-                st.dataframe(random_rows)
-        
-                # Download the dataset using base64 encoding
-                csv = random_rows.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                href = f'data:file/csv;base64,{b64}'
-                st.markdown(f'<a href="{href}" download="generated_dataset.csv">📥 Click here to download the Generated Dataset</a>', 
-                            unsafe_allow_html=True)
+                # Sample only on the button's action; the result is reused across reruns
+                st.session_state["active_sample"] = sample_key
         
-                st.header("📊 Dataset Overview")
-                    
+        if selected_fields and st.session_state.get("active_sample") == sample_key:
+            random_rows = cached_sample(sample_key)
+            st.subheader("📝 Generated Dataset:")
+            st.dataframe(random_rows)
+    
+            # Download the dataset: the CSV is only written when the button is clicked
+            csv_download_button(random_rows, "📥 Download the Generated Dataset")
+    
+            st.header("📊 Dataset Overview")
+            
+            # The overview of a generated sample is only computed once the user opens it
+            if st.toggle("👀 Show the overview of the generated dataset"):
+                overview = cached_sample_overview(sample_key)
+                
                 # Dataset Shape
                 st.subheader("📐 Entire Dataset Shape:")
-                st.write(dataset.shape)
-                
+                st.write((datasets[selected_dataset]["rows"], len(columns)))
+            
                 st.subheader("📐 Generated Dataset Shape:")
-                st.write(random_rows.shape)
-        
+                st.write(overview["shape"])
+    
                 # Column Names
                 st.subheader("📋 Column Names:")
-                st.write(random_rows.columns)
-        
+                st.write(overview["columns"])
+    
                 # Data Types
                 st.subheader("🔠 Data Types:")
-                st.write(random_rows.dtypes)
-        
+                st.write(overview["dtypes"])
+    
                 # Summary Statistics
                 st.subheader("📈 Summary Statistics:")
-                st.write(random_rows.describe())
-                
+                st.write(overview["describe"])
+            
                 # Data Head
                 st.subheader("🔝 Data Head:")
-                st.write(random_rows.head())
-        
+                st.write(overview["head"])
+    
                 # Data Tail
                 st.subheader("🔚 Data Tail:")
-                st.write(random_rows.tail())
+                st.write(overview["tail"])
+
+        # Bootstrap replicates of the selected fields, for model evaluation
+        bootstrap_download(datasets[selected_dataset], selected_fields, seed)
 
 # Page 6: Dataset for Clustering (ML)
 elif page == "🧩 Dataset for Clustering (ML)":
     st.header("📊 Dataset for Clustering (ML) Page")
 
-    # Select clustering dataset
-    selected_dataset = st.selectbox("🔍 Select a clustered dataset:", 
-                                    ("📂 Sample Dataset 1", "📂 Sample Dataset 2", "📂 Sample Dataset 3"))
-
-    dataset_paths = {
-        "📂 Sample Dataset 1": "Datasets for ML/Clustering/clustered_data_1.csv",
-        "📂 Sample Dataset 2": "Datasets for ML/Clustering/clustered_data_2.csv",
-        "📂 Sample Dataset 3": "Datasets for ML/Clustering/clustered_data_3.csv", 
-    }
+    # Select clustering dataset (listed from the catalog manifest)
+    datasets = catalog_datasets("Clustering")
+    if not datasets:
+        st.warning("⚠️ No datasets of this kind were found in the catalog.")
+        st.stop()
+    selected_dataset = st.selectbox("🔍 Select a clustered dataset:", list(datasets))
 
     option = st.radio("🎛️ Select dataset generation option:", 
-                      ("📂 Entire Dataset", "🎲 Random Number of Rows with Selected Fields"))
+                      ("📂 Entire Dataset", "🎲 Random Number of Rows with Selected Fields",
+                       "🧬 New Points per Cluster (any number of rows)"))
         
     if option == "📂 Entire Dataset":
         # Display the entire dataset
         if st.button("✨ Generate Dataset"):
-            dataset_url = dataset_paths[selected_dataset]
+            dataset_url = datasets[selected_dataset]["path"]
     
             # Load and display the selected dataset
-            dataset = pd.read_csv(dataset_url)
+            dataset = load_dataset(dataset_url)
             
             st.subheader("📝 Generated Dataset:")
             st.dataframe(dataset)
 
-            # Download the dataset using base64 encoding
-            csv = dataset.to_csv(index=False)
-            b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-            href = f'data:file/csv;base64,{b64}'
-            st.markdown(f'<a href="{href}" download="generated_dataset.csv">📥 Click here to download the Generated Dataset</a>', 
-                        unsafe_allow_html=True)
+            # Download the dataset: the CSV is only written when the button is clicked
+            csv_download_button(dataset, "📥 Download the Generated Dataset")
 
+            # The overview of a catalog dataset is precomputed and stored in the manifest
+            overview = dataset_overview(datasets[selected_dataset])
             st.header("📊 Dataset Overview")
             
             # Dataset Shape
             st.subheader("📐 Dataset Shape:")
-            st.write(dataset.shape)
+            st.write(overview["shape"])
     
             # Column Names
             st.subheader("📋 Column Names:")
-            st.write(dataset.columns)
+            st.write(overview["columns"])
     
             # Data Types
             st.subheader("🔠 Data Types:")
-            st.write(dataset.dtypes)
+            st.write(overview["dtypes"])
     
             # Summary Statistics
             st.subheader("📈 Summary Statistics:")
-            st.write(dataset.describe())
+            st.write(overview["describe"])
             
             # Data Head
             st.subheader("🔝 Data Head:")
-            st.write(dataset.head())
+            st.write(overview["head"])
     
             # Data Tail
             st.subheader("🔚 Data Tail:")
-            st.write(dataset.tail())
+            st.write(overview["tail"])
+        
+    elif option == "🧬 New Points per Cluster (any number of rows)":
+        dataset_url = datasets[selected_dataset]["path"]
+        columns = datasets[selected_dataset]["columns"]
+        label_column = datasets[selected_dataset]["label_column"] or columns[-1]
+        st.info("ℹ️ New points are drawn from a Gaussian fitted to each cluster (its mean and covariance), with "
+                "clusters keeping their share of the rows. One-hot fields are drawn from their frequency in each cluster.")
+    
+        st.write("🛠️ Select the fields you want to include in the generated dataset:")
+        selected_fields = st.multiselect("📋 Select field names:", columns)
+        
+        # The cluster field is always included
+        if label_column not in selected_fields:
+            selected_fields.append(label_column)
+        
+        # Input number of rows (no limit: memory is bounded by the chunk size)
+        num_rows = st.number_input("🔢 Enter the number of rows:", min_value=1, value=100_000, step=100_000)
+        seed = st.number_input("🌱 Random seed (the same seed, fields and rows give the same dataset):", min_value=0, value=0, step=1)
+        file_name = st.text_input("💾 Output file name", value="clustered_dataset.csv")
+    
+        if st.button("✨ Generate Dataset"):
+            if not file_name.strip():
+                st.warning("⚠️ Please enter an output file name.")
+            else:
+                # The fitted parameters are cached per dataset, so only the sampling runs on later clicks
+                model = fit_cluster_model(dataset_url, label_column)
+                output_path = session_output_path(file_name)
+                progress = st.progress(0.0, text="🏭 Generating...")
+                report = lambda done: progress.progress(done / num_rows, text=f"🏭 {done:,} / {num_rows:,} rows")
+                summary = StreamingSummary()
+                stream_clusters_to_csv(model, selected_fields, num_rows, output_path, seed, progress=report, summary=summary)
+                progress.empty()
+    
+                st.success(f"✅ Wrote {num_rows:,} rows ({os.path.getsize(output_path) / 2**20:,.1f} MB) to `{output_path}`.")
+                st.subheader("📊 Preview (first 100 rows):")
+                st.dataframe(pd.read_csv(output_path, nrows=100))
+                st.subheader("📐 Summary Statistics (all rows):")
+                st.write(summary.describe())
+                file_download_button(output_path, "⬇️ Download Generated Dataset")
         
     else:
-        dataset_url = dataset_paths[selected_dataset]
+        dataset_url = datasets[selected_dataset]["path"]
 
-        # Load and display the selected dataset
-        dataset = pd.read_csv(dataset_url)
+        # The field list comes from the catalog manifest; no data is read until a sample is generated
+        columns = datasets[selected_dataset]["columns"]
     
         st.write("🛠️ Select the fields you want to include in the generated dataset:")
-        selected_fields = st.multiselect("📋 Select field names:", dataset.columns)
+        selected_fields = st.multiselect("📋 Select field names:", columns)
         
         # Make the last field compulsory
-        last_field = dataset.columns[-1]
+        last_field = columns[-1]
         
         if last_field not in selected_fields:
             selected_fields.append(last_field)
         
         # Generate random number of rows up to 500
         num_rows = st.number_input("🔢 Select the number of rows (1-500):", min_value=1, max_value=500, value=10)
-        random_rows = dataset[selected_fields].sample(n=num_rows, replace=True)
+        seed = st.number_input("🌱 Random seed (the same seed, fields and rows give the same dataset):", min_value=0, value=0, step=1)
+        label_column = datasets[selected_dataset]["label_column"]
+        sampling = None
+        if label_column is not None:
+            # Stratified and balanced samples keep minority classes that random rows can miss
+            sampling_mode = st.radio("🎯 Sampling:", list(SAMPLING_MODES), horizontal=True,
+                                     help=f"Classes are taken from the `{label_column}` column.")
+            if SAMPLING_MODES[sampling_mode] is not None:
+                sampling = (SAMPLING_MODES[sampling_mode], label_column)
+        sample_key = (dataset_url, seed, tuple(selected_fields), num_rows, sampling)
 
         if st.button("✨ Generate Dataset"):
             if not selected_fields:
                 st.warning("⚠️ Please select at least one field.")
             else:
-                st.subheader("📝 Generated Dataset:")
-                st.dataframe(random_rows)
-        
-                # Download the dataset using base64 encoding
-                csv = random_rows.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                href = f'data:file/csv;base64,{b64}'
-                st.markdown(f'<a href="{href}" download="generated_dataset.csv">📥 Click here to download the Generated Dataset</a>', 
-                            unsafe_allow_html=True)
+                # Sample only on the button's action; the result is reused across reruns
+                st.session_state["active_sample"] = sample_key
         
-                st.header("📊 Dataset Overview")
-                    
+        if selected_fields and st.session_state.get("active_sample") == sample_key:
+            random_rows = cached_sample(sample_key)
+            st.subheader("📝 Generated Dataset:")
+            st.dataframe(random_rows)
+    
+            # Download the dataset: the CSV is only written when the button is clicked
+            csv_download_button(random_rows, "📥 Download the Generated Dataset")
+    
+            st.header("📊 Dataset Overview")
+            
+            # The overview of a generated sample is only computed once the user opens it
+            if st.toggle("👀 Show the overview of the generated dataset"):
+                overview = cached_sample_overview(sample_key)
+                
                 # Dataset Shape
                 st.subheader("📐 Entire Dataset Shape:")
-                st.write(dataset.shape)
-                
+                st.write((datasets[selected_dataset]["rows"], len(columns)))
+            
                 st.subheader("📐 Generated Dataset Shape:")
-                st.write(random_rows.shape)
-        
+                st.write(overview["shape"])
+    
                 # Column Names
                 st.subheader("📋 Column Names:")
-                st.write(random_rows.columns)
-        
+                st.write(overview["columns"])
+    
                 # Data Types
                 st.subheader("🔠 Data Types:")
-                st.write(random_rows.dtypes)
-        
+                st.write(overview["dtypes"])
+    
                 # Summary Statistics
                 st.subheader("📈 Summary Statistics:")
-                st.write(random_rows.describe())
-                
+                st.write(overview["describe"])
+            
                 # Data Head
                 st.subheader("🔝 Data Head:")
-                st.write(random_rows.head())
-        
+                st.write(overview["head"])
+    
                 # Data Tail
                 st.subheader("🔚 Data Tail:")
-                st.write(random_rows.tail())
+                st.write(overview["tail"])
+
+        # Bootstrap replicates of the selected fields, for model evaluation
+        bootstrap_download(datasets[selected_dataset], selected_fields, seed)
 
 # Page 7: Dataset for Association (ML)
 elif page == "🔗 Dataset for Association (ML)":
     st.header("📚 Dataset for Association (ML) Page")
 
-    # Select association dataset
-    selected_dataset = st.selectbox("🔍 Select an association dataset:", 
-                                    ("🥖 Bakery Dataset", "🛒 Basket Analysis Dataset", "🛍️ Groceries Dataset"))
-
-    dataset_paths = {
-        "🥖 Bakery Dataset": "Datasets for ML/Association/bakery_data.csv",
-        "🛒 Basket Analysis Dataset": "Datasets for ML/Association/basket_analysis_data.csv",
-        "🛍️ Groceries Dataset": "Datasets for ML/Association/groceries_data.csv", 
-    }
+    # Select association dataset (listed from the catalog manifest)
+    datasets = catalog_datasets("Association")
+    if not datasets:
+        st.warning("⚠️ No datasets of this kind were found in the catalog.")
+        st.stop()
+    selected_dataset = st.selectbox("🔍 Select an association dataset:", list(datasets))
 
     option = st.radio("🎛️ Select dataset generation option:", 
                       ("📂 Entire Dataset", "🎲 Random Number of Rows with Selected Fields"))
@@ -698,102 +1292,141 @@ elif page == "🔗 Dataset for Association (ML)":
     if option == "📂 Entire Dataset":
         # Display the entire dataset
         if st.button("✨ Generate Dataset"):
-            dataset_url = dataset_paths[selected_dataset]
+            dataset_url = datasets[selected_dataset]["path"]
     
             # Load and display the selected dataset
-            dataset = pd.read_csv(dataset_url)
+            dataset = load_dataset(dataset_url)
             
             st.subheader("📝 Generated Dataset:")
             st.dataframe(dataset)
 
-            # Download the dataset using base64 encoding
-            csv = dataset.to_csv(index=False)
-            b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-            href = f'data:file/csv;base64,{b64}'
-            st.markdown(f'<a href="{href}" download="generated_dataset.csv">📥 Click here to download the Generated Dataset</a>', 
-                        unsafe_allow_html=True)
+            # Download the dataset: the CSV is only written when the button is clicked
+            csv_download_button(dataset, "📥 Download the Generated Dataset")
 
+            # The overview of a catalog dataset is precomputed and stored in the manifest
+            overview = dataset_overview(datasets[selected_dataset])
             st.header("📊 Dataset Overview")
             
             # Dataset Shape
             st.subheader("📐 Dataset Shape:")
-            st.write(dataset.shape)
+            st.write(overview["shape"])
     
             # Column Names
             st.subheader("📋 Column Names:")
-            st.write(dataset.columns)
+            st.write(overview["columns"])
     
             # Data Types
             st.subheader("🔠 Data Types:")
-            st.write(dataset.dtypes)
+            st.write(overview["dtypes"])
     
             # Summary Statistics
             st.subheader("📈 Summary Statistics:")
-            st.write(dataset.describe())
+            st.write(overview["describe"])
             
             # Data Head
             st.subheader("🔝 Data Head:")
-            st.write(dataset.head())
+            st.write(overview["head"])
     
             # Data Tail
             st.subheader("🔚 Data Tail:")
-            st.write(dataset.tail())
+            st.write(overview["tail"])
         
     else:
-        dataset_url = dataset_paths[selected_dataset]
+        dataset_url = datasets[selected_dataset]["path"]
 
-        # Load and display the selected dataset
-        dataset = pd.read_csv(dataset_url)
+        # The field list comes from the catalog manifest; no data is read until a sample is generated
+        columns = datasets[selected_dataset]["columns"]
     
         st.write("🛠️ Select the fields you want to include in the generated dataset:")
-        selected_fields = st.multiselect("📋 Select field names:", dataset.columns)
+        selected_fields = st.multiselect("📋 Select field names:", columns)
         
-        # Generate random number of rows up to 500
-        num_rows = st.number_input("🔢 Select the number of rows (1-500):", min_value=1, max_value=500, value=10)
-        random_rows = dataset[selected_fields].sample(n=num_rows, replace=True)
+        # Basket datasets can be sampled by whole transaction, so no basket is split across the sample
+        sampling = None
+        if basket_layout(dataset_url) is not None:
+            sampling_mode = st.radio("🧺 Sampling:", list(BASKET_SAMPLING_MODES), horizontal=True,
+                                     help="Whole transactions keep every row (item) of each transaction drawn.")
+            sampling = BASKET_SAMPLING_MODES[sampling_mode]
+        
+        # Generate random number of rows (or transactions) up to 500
+        unit = "transactions" if sampling is not None else "rows"
+        num_rows = st.number_input(f"🔢 Select the number of {unit} (1-500):", min_value=1, max_value=500, value=10)
+        seed = st.number_input("🌱 Random seed (the same seed, fields and rows give the same dataset):", min_value=0, value=0, step=1)
+        sample_key = (dataset_url, seed, tuple(selected_fields), num_rows, sampling)
 
         if st.button("✨ Generate Dataset"):
             if not selected_fields:
                 st.warning("⚠️ Please select at least one field.")
             else:
-                st.subheader("📝 Generated Dataset:")
-                st.dataframe(random_rows)
-        
-                # Download the dataset using base64 encoding
-                csv = random_rows.to_csv(index=False)
-                b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                href = f'data:file/csv;base64,{b64}'
-                st.markdown(f'<a href="{href}" download="generated_dataset.csv">📥 Click here to download the Generated Dataset</a>', 
-                            unsafe_allow_html=True)
+                # Sample only on the button's action; the result is reused across reruns
+                st.session_state["active_sample"] = sample_key
         
-                st.header("📊 Dataset Overview")
-                    
+        if selected_fields and st.session_state.get("active_sample") == sample_key:
+            random_rows = cached_sample(sample_key)
+            st.subheader("📝 Generated Dataset:")
+            st.dataframe(random_rows)
+    
+            # Download the dataset: the CSV is only written when the button is clicked
+            csv_download_button(random_rows, "📥 Download the Generated Dataset")
+    
+            st.header("📊 Dataset Overview")
+            
+            # The overview of a generated sample is only computed once the user opens it
+            if st.toggle("👀 Show the overview of the generated dataset"):
+                overview = cached_sample_overview(sample_key)
+                
                 # Dataset Shape
                 st.subheader("📐 Entire Dataset Shape:")
-                st.write(dataset.shape)
-                
+                st.write((datasets[selected_dataset]["rows"], len(columns)))
+            
                 st.subheader("📐 Generated Dataset Shape:")
-                st.write(random_rows.shape)
-        
+                st.write(overview["shape"])
+    
                 # Column Names
                 st.subheader("📋 Column Names:")
-                st.write(random_rows.columns)
-        
+                st.write(overview["columns"])
+    
                 # Data Types
                 st.subheader("🔠 Data Types:")
-                st.write(random_rows.dtypes)
-        
+                st.write(overview["dtypes"])
+    
                 # Summary Statistics
                 st.subheader("📈 Summary Statistics:")
-                st.write(random_rows.describe())
-                
+                st.write(overview["describe"])
+            
                 # Data Head
                 st.subheader("🔝 Data Head:")
-                st.write(random_rows.head())
-        
+                st.write(overview["head"])
+    
                 # Data Tail
                 st.subheader("🔚 Data Tail:")
-                st.write(random_rows.tail())
+                st.write(overview["tail"])
+
+            # Rules are only mined on request; those of the entire dataset are cached per thresholds
+            layout = basket_layout(dataset_url)
+            if layout is not None:
+                st.header("🔎 Association Rules")
+                if st.toggle("🔎 Compare the association rules of the generated and entire datasets"):
+                    if "one_hot" in layout:
+                        layout = {"one_hot": [field for field in selected_fields if field in layout["one_hot"]]}
+                    rule_columns = st.columns(3)
+                    min_support = rule_columns[0].number_input("Minimum support (%)", min_value=0.01, max_value=100.0,
+                                                               value=MIN_SUPPORT * 100, step=0.1, format="%.2f") / 100
+                    min_confidence = rule_columns[1].number_input("Minimum confidence (%)", min_value=0.0, max_value=100.0,
+                                                                  value=MIN_CONFIDENCE * 100, step=5.0) / 100
+                    max_size = rule_columns[2].number_input("Largest itemset", min_value=2, max_value=5, value=MAX_ITEMSET_SIZE)
+
+                    generated_rules = sample_rules(random_rows, layout, min_support, min_confidence, max_size)
+                    if generated_rules is None or not layout_fields(layout):
+                        st.info("ℹ️ Include " + (", ".join(f"`{field}`" for field in layout_fields(layout)) or "some item fields")
+                                + " in the selected fields to mine association rules.")
+                    else:
+                        source_rules = dataset_rules(dataset_url, layout, min_support, min_confidence, max_size)
+                        comparison = compare_rules(source_rules, generated_rules)
+                        status = comparison["status"].value_counts()
+                        st.write(f"📏 **{len(source_rules):,}** rules in the entire dataset and **{len(generated_rules):,}** "
+                                 f"in the generated dataset: {status.get('kept', 0):,} kept, {status.get('lost', 0):,} lost "
+                                 f"and {status.get('new', 0):,} new.")
+                        st.dataframe(comparison)
 
 # Page 7: Dataset Trimmer
 elif page == "✂️ Dataset Trimmer":
@@ -802,66 +1435,84 @@ elif page == "✂️ Dataset Trimmer":
     # Upload a dataset
     uploaded_file = st.file_uploader("📤 Upload a Dataset (CSV format only):", type=["csv"])
     
-    # Initialize data as None
-    original_dataset = None
+    # Uploads that fit the shared cache are parsed once per content hash; for larger ones only
+    # the header is read here and rows are streamed in chunks when the dataset is generated
+    dataset = None
+    columns = None
     
     # Check if a file was uploaded and if it's valid
     if uploaded_file is not None:
         try:
-            original_dataset = pd.read_csv(uploaded_file)
+            dataset = parsed_upload(uploaded_file)
+            columns = read_csv_columns(uploaded_file) if dataset is None else dataset.columns
         except (ValueError, pd.errors.ParserError):
             st.error("❌ The uploaded dataset is not in a valid format or language. Please upload a valid dataset in CSV format.")
-            original_dataset = None  # Set data to None if it's not valid
+            columns = None  # Set data to None if it's not valid
 
-    if original_dataset is not None and not original_dataset.empty:
-        
-        if original_dataset.shape[0] <= 5000 and original_dataset.shape[1] <= 50:
+    # A cached upload must hold rows; a streamed one is too large to be empty
+    if columns is not None and len(columns) and (dataset is None or not dataset.empty):
     
-            # Input fields
-            st.write("🛠️ Select the fields you want to include in the generated dataset:")
-            selected_fields = st.multiselect("📋 Select field names:", original_dataset.columns)
-            
-            # Input number of rows (max original dataset rows)
-            num_rows = st.number_input(f"🔢 Enter the number of rows (max {original_dataset.shape[0]} rows):", 
-                                       min_value=1, max_value=original_dataset.shape[0])
-            
-            # Generate the dataset
-            if st.button("✨ Generate Trimmed Dataset"):
-                if not selected_fields:
-                    st.warning("⚠️ Please select at least one field.")
+        # Input fields
+        st.write("🛠️ Select the fields you want to include in the generated dataset:")
+        selected_fields = st.multiselect("📋 Select field names:", columns)
+        
+        # Input number of rows
+        num_rows = st.number_input("🔢 Enter the number of rows:", min_value=1, max_value=10_000_000)
+        replace = st.checkbox("🔁 Sample with replacement (rows may repeat)", value=True)
+        seed = st.number_input("🌱 Random seed (the same seed, fields and rows give the same dataset):", min_value=0, value=0, step=1)
+        
+        # Generate the dataset
+        if st.button("✨ Generate Trimmed Dataset"):
+            if not selected_fields:
+                st.warning("⚠️ Please select at least one field.")
+            else:
+                # Randomly sample rows from the uploaded dataset, in one pass over its chunks when it is not cached
+                if dataset is not None:
+                    generated_df, total_rows = sample_rows(dataset, selected_fields, num_rows, replace=replace, seed=seed)
+                else:
+                    progress = st.progress(0.0, text="✂️ Reading the dataset...")
+                    report = lambda seen: progress.progress(min(uploaded_file.tell() / max(uploaded_file.size, 1), 1.0),
+                                                            text=f"✂️ {seen:,} rows read")
+                    try:
+                        generated_df, total_rows = reservoir_sample_csv(uploaded_file, selected_fields, num_rows,
+                                                                        replace=replace, seed=seed, progress=report)
+                    except (ValueError, pd.errors.ParserError):
+                        st.error("❌ The uploaded dataset is not in a valid format or language. Please upload a valid dataset in CSV format.")
+                        st.stop()
+                    finally:
+                        uploaded_file.seek(0)
+                    progress.empty()
+                
+                if len(generated_df) < num_rows:
+                    st.info(f"ℹ️ The dataset has {total_rows:,} rows, so all of them were kept.")
+                if len(generated_df) > 5000:
+                    st.subheader("📝 Generated Dataset (first 5,000 rows):")
+                    st.dataframe(generated_df.head(5000))
                 else:
-                    # Randomly sample rows from the original dataset
-                    generated_df = original_dataset[selected_fields].sample(n=num_rows, replace=True)
                     st.subheader("📝 Generated Dataset:")
                     st.dataframe(generated_df)
-            
-                    # Download the dataset using base64 encoding
-                    csv = generated_df.to_csv(index=False)
-                    b64 = base64.b64encode(csv.encode()).decode()  # Encode to base64
-                    href = f'data:file/csv;base64,{b64}'
-                    st.markdown(f'<a href="{href}" download="generated_dataset.csv">📥 Click here to download the Generated Dataset</a>', 
-                                unsafe_allow_html=True)
-                    
-                    st.header("📊 Dataset Overview")
-                    
-                    # Dataset Shape
-                    st.subheader("📐 Dataset Shape:")
-                    st.write(generated_df.shape)
-            
-                    # Column Names
-                    st.subheader("📋 Column Names:")
-                    st.write(generated_df.columns)
-            
-                    # Data Types
-                    st.subheader("🔠 Data Types:")
-                    st.write(generated_df.dtypes)
-            
-                    # Summary Statistics
-                    st.subheader("📈 Summary Statistics:")
-                    st.write(generated_df.describe())
+        
+                # Download the dataset: the CSV is only written when the button is clicked
+                csv_download_button(generated_df, "📥 Download the Generated Dataset")
+                
+                st.header("📊 Dataset Overview")
+                
+                # Dataset Shape
+                st.subheader("📐 Dataset Shape:")
+                st.write(generated_df.shape)
+        
+                # Column Names
+                st.subheader("📋 Column Names:")
+                st.write(generated_df.columns)
+        
+                # Data Types
+                st.subheader("🔠 Data Types:")
+                st.write(generated_df.dtypes)
+        
+                # Summary Statistics
+                st.subheader("📈 Summary Statistics:")
+                st.write(summarize(generated_df))
 
-        else:
-            st.warning("⚠️ The dataset exceeds the size limits (max rows: 5000, max columns: 50).")
     else:
         st.error("❌ Please upload a valid dataset to continue.")
 
@@ -878,4 +1529,4 @@ elif page == "🔗 Quick Links":
     }
     
     for name, url in links.items():
-        st.link_button(name, url, use_container_width=True)
+        st.link_button(name, url, width="stretch")
@@ -0,0 +1,5 @@
+"""Data Weaver's generation, sampling and export logic, usable without Streamlit.
+
+The web app (app.py) and the command line interface (python -m dataweaver) are both built
+on these modules. Nothing here imports Streamlit.
+"""
@@ -0,0 +1,157 @@
+"""Transaction x item encoding of the Association datasets, for sampling whole transactions.
+
+A basket dataset is either long (one row per item bought, with columns identifying the
+transaction) or one-hot (one row per transaction, one boolean column per item). Either way
+it is encoded once per content hash into CSR arrays saved as .npy files under CACHE_DIR,
+which are memory-mapped on every later use instead of re-grouping the rows with pandas.
+"""
+import functools
+import json
+import os
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .datasets import CACHE_DIR, DATASETS_DIR, file_digest, load_dataset
+
+# Long-format datasets: the columns identifying a transaction, and the item column. Other
+# Association datasets whose columns (bar an index) are all boolean are read as one-hot.
+BASKET_LAYOUTS = {
+    "Association/bakery_data.csv": {"transaction": ["TransactionNo"], "item": "Items"},
+    "Association/groceries_data.csv": {"transaction": ["Member_number", "Date"], "item": "itemDescription"},
+}
+BASKET_ARRAYS = ("indptr", "indices", "row_ptr", "rows")
+
+class BasketMatrix:
+    """A transaction x item matrix in CSR form, over read-only memory-mapped arrays.
+
+    The distinct items of transaction t are items[indices[indptr[t]:indptr[t + 1]]] (in
+    item order), and its rows in the dataset are rows[row_ptr[t]:row_ptr[t + 1]].
+    Transactions are numbered in order of their first row.
+    """
+
+    def __init__(self, items, indptr, indices, row_ptr, rows):
+        self.items = items
+        self.indptr, self.indices = indptr, indices
+        self.row_ptr, self.rows = row_ptr, rows
+
+    def __len__(self):
+        return len(self.indptr) - 1
+
+    def transaction_rows(self, transactions):
+        """Dataset row positions of the given transactions, transaction by transaction."""
+        starts, ends = self.row_ptr[transactions], self.row_ptr[np.asarray(transactions) + 1]
+        lengths = ends - starts
+        # Each transaction's rows are a contiguous run of self.rows: gather all runs at once
+        positions = np.repeat(starts - np.concatenate([[0], np.cumsum(lengths)[:-1]]), lengths) + np.arange(lengths.sum())
+        return self.rows[positions]
+
+    def item_counts(self):
+        """Number of transactions holding each item."""
+        return np.bincount(self.indices, minlength=len(self.items))
+
+def basket_layout(path):
+    """The layout of a basket dataset ({"transaction": [...], "item": ...} or {"one_hot": [...]}), or None."""
+    key = os.path.relpath(path, DATASETS_DIR).replace(os.sep, "/")
+    if key in BASKET_LAYOUTS:
+        return BASKET_LAYOUTS[key]
+    if not key.startswith("Association/"):
+        return None
+    dataset = load_dataset(path)
+    items = [column for column in dataset.columns if dataset[column].dtype == bool]
+    # A leading unnamed column is the index written out with the one-hot table
+    others = [column for column in dataset.columns if column not in items]
+    if items and all(str(column).startswith("Unnamed: ") for column in others):
+        return {"one_hot": items}
+    return None
+
+def basket_cache_path(path, digest):
+    """Return the directory holding the CSR arrays of a basket dataset with the given hash."""
+    relative = os.path.relpath(path, DATASETS_DIR)
+    stem = os.path.splitext(relative)[0].replace(os.sep, "__")
+    return os.path.join(CACHE_DIR, "baskets", f"{stem}-{digest[:16]}")
+
+def encode_baskets(dataset, layout):
+    """The CSR arrays (items, indptr, indices, row_ptr, rows) of the rows of a basket dataset."""
+    if "one_hot" in layout:
+        matrix = dataset[layout["one_hot"]].to_numpy(dtype=bool)
+        indptr = np.concatenate([[0], np.cumsum(matrix.sum(axis=1))])
+        return list(layout["one_hot"]), indptr, np.nonzero(matrix)[1], np.arange(len(matrix) + 1), np.arange(len(matrix))
+
+    groups = dataset.groupby(layout["transaction"], sort=False, dropna=False).ngroup().to_numpy()
+    codes, items = pd.factorize(dataset[layout["item"]], sort=True)
+    # Rows sorted by transaction (then item); a transaction's repeated items count once
+    rows = np.lexsort((codes, groups))
+    groups, codes = groups[rows], codes[rows]
+    row_ptr = np.concatenate([[0], np.cumsum(np.bincount(groups, minlength=groups.max(initial=-1) + 1))])
+    keep = (codes >= 0) & np.concatenate([[True], (groups[1:] != groups[:-1]) | (codes[1:] != codes[:-1])])[:len(codes)]
+    indptr = np.concatenate([[0], np.cumsum(np.bincount(groups[keep], minlength=len(row_ptr) - 1))])
+    return [str(item) for item in items], indptr, codes[keep], row_ptr, rows
+
+def layout_fields(layout):
+    """The columns a basket layout reads."""
+    return list(layout["one_hot"]) if "one_hot" in layout else layout["transaction"] + [layout["item"]]
+
+def frame_baskets(dataset, layout):
+    """The BasketMatrix of a frame of basket rows (such as a generated sample), built in memory."""
+    items, *arrays = encode_baskets(dataset, layout)
+    return BasketMatrix(np.array(items, dtype=object), *arrays)
+
+def build_basket_cache(path, digest, layout):
+    """Encode a basket dataset and save its arrays, replacing older versions of the same dataset.
+
+    The arrays are written to a temporary directory that is then renamed into place, so a
+    concurrent reader never maps a half-written cache.
+    """
+    target = basket_cache_path(path, digest)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    items, *arrays = encode_baskets(load_dataset(path, layout_fields(layout)), layout)
+    # A directory of its own per build: threads of one process share a process id
+    temporary = tempfile.mkdtemp(prefix=os.path.basename(target) + ".", suffix=".tmp", dir=os.path.dirname(target))
+    try:
+        for name, array in zip(BASKET_ARRAYS, arrays):
+            np.save(os.path.join(temporary, f"{name}.npy"), np.asarray(array, dtype=np.int64 if name != "indices" else np.int32))
+        with open(os.path.join(temporary, "items.json"), "w", encoding="utf-8") as f:
+            json.dump(items, f, ensure_ascii=False)
+        os.replace(temporary, target)
+    except OSError:
+        # Another thread or process built it first (or the build failed): the cache in place stands
+        shutil.rmtree(temporary, ignore_errors=True)
+        if not os.path.exists(os.path.join(target, "items.json")):
+            raise
+
+    prefix = os.path.basename(target).rsplit("-", 1)[0] + "-"
+    for name in os.listdir(os.path.dirname(target)):
+        stale = os.path.join(os.path.dirname(target), name)
+        if name.startswith(prefix) and stale != target and not name.endswith(".tmp"):
+            shutil.rmtree(stale, ignore_errors=True)
+    return target
+
+@functools.lru_cache(maxsize=16)
+def _open_baskets(path, digest):
+    layout = basket_layout(path)
+    if layout is None:
+        raise ValueError(f"{path} is not a basket dataset.")
+    cached = basket_cache_path(path, digest)
+    if not os.path.exists(os.path.join(cached, "items.json")):
+        cached = build_basket_cache(path, digest, layout)
+    with open(os.path.join(cached, "items.json"), encoding="utf-8") as f:
+        items = np.array(json.load(f), dtype=object)
+    arrays = [np.load(os.path.join(cached, f"{name}.npy"), mmap_mode="r") for name in BASKET_ARRAYS]
+    return BasketMatrix(items, *arrays)
+
+def load_baskets(path):
+    """The BasketMatrix of an Association dataset, built on first use and then memory-mapped."""
+    return _open_baskets(path, file_digest(path))
+
+def sample_transactions(path, fields, num_transactions, rng):
+    """The rows of num_transactions distinct transactions drawn at random, in dataset order.
+
+    Every row of a drawn transaction is kept, so baskets are never split. All transactions
+    are returned when the dataset has fewer than num_transactions.
+    """
+    baskets = load_baskets(path)
+    drawn = np.sort(rng.permutation(len(baskets))[:num_transactions])
+    return load_dataset(path, fields).take(np.sort(baskets.transaction_rows(drawn)))
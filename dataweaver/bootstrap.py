@@ -0,0 +1,104 @@
+"""Bootstrap replicates of a dataset: one index matrix over a single copy of the rows.
+
+All replicates are drawn at once as a (replicates x size) matrix of row positions, and
+each is materialized only when asked for. They are exported as one ZIP archive holding
+the rows once (data.csv), the index matrix and every replicate's out-of-bag rows (.npy
+files), and a manifest.json recording the source, fields and seed.
+"""
+import io
+import json
+import zipfile
+
+import numpy as np
+import pandas as pd
+
+from .export import write_csv_chunks
+
+BOOTSTRAP_VERSION = 1
+BOOTSTRAP_ARRAYS = ("indices", "oob_indptr", "oob_indices")
+# Out-of-bag rows are found for as many replicates at a time as fit a mask of this many cells
+OOB_BLOCK_CELLS = 2**24
+# The app and the CLI draw at most this many rows (replicates x rows per replicate), each a
+# 4-byte index, plus the out-of-bag rows (about a third as many)
+MAX_BOOTSTRAP_POSITIONS = 50_000_000
+
+class BootstrapReplicates:
+    """Bootstrap replicates of a frame, held as row positions into it rather than as copies.
+
+    Replicate b is data.take(indices[b]), and its out-of-bag rows (those it never drew)
+    are oob_indices[oob_indptr[b]:oob_indptr[b + 1]], in row order.
+    """
+
+    def __init__(self, data, indices, oob_indptr, oob_indices):
+        self.data = data
+        self.indices = indices
+        self.oob_indptr, self.oob_indices = oob_indptr, oob_indices
+
+    def __len__(self):
+        return len(self.indices)
+
+    def replicate(self, b):
+        """The rows of replicate b, in the order drawn."""
+        return self.data.take(self.indices[b])
+
+    def out_of_bag(self, b):
+        """The rows replicate b left out, for evaluating a model fitted on it."""
+        return self.data.take(self.oob_indices[self.oob_indptr[b]:self.oob_indptr[b + 1]])
+
+def bootstrap_indices(rows, replicates, size, rng):
+    """A (replicates x size) matrix of row positions drawn with replacement, in one call."""
+    dtype = np.int32 if rows <= np.iinfo(np.int32).max else np.int64
+    return rng.integers(0, rows, size=(replicates, size), dtype=dtype)
+
+def out_of_bag(indices, rows):
+    """CSR arrays (indptr, indices) of the rows each replicate of an index matrix never drew.
+
+    Replicates are marked in blocks whose (replicates x rows) mask holds about
+    OOB_BLOCK_CELLS cells, so memory stays at one block's mask plus the result.
+    """
+    block = max(1, OOB_BLOCK_CELLS // max(rows, 1))
+    indptr = np.zeros(len(indices) + 1, dtype=np.int64)
+    pieces = [np.empty(0, dtype=indices.dtype)]
+    for start in range(0, len(indices), block):
+        drawn = np.zeros((len(indices[start:start + block]), rows), dtype=bool)
+        drawn[np.arange(len(drawn))[:, None], indices[start:start + block]] = True
+        replicate, row = np.nonzero(~drawn)
+        indptr[start + 1:start + len(drawn) + 1] = np.bincount(replicate, minlength=len(drawn))
+        pieces.append(row.astype(indices.dtype))
+    return np.cumsum(indptr), np.concatenate(pieces)
+
+def bootstrap_replicates(data, replicates, rng, size=None):
+    """Draw replicates bootstrap replicates of size rows (default: as many as data has) from a frame."""
+    indices = bootstrap_indices(len(data), replicates, len(data) if size is None else size, rng)
+    return BootstrapReplicates(data, indices, *out_of_bag(indices, len(data)))
+
+def write_bootstrap_archive(boot, path, metadata=None):
+    """Write the rows, index matrix and out-of-bag rows of some replicates to a ZIP archive.
+
+    metadata (such as the source dataset and seed) is recorded in the archive's manifest,
+    alongside the shape of the replicates.
+    """
+    manifest = dict(metadata or {}, version=BOOTSTRAP_VERSION, rows=len(boot.data), replicates=len(boot),
+                    size=int(boot.indices.shape[1]), fields=[str(column) for column in boot.data.columns])
+    # The indices are small integers, so even the fastest compression level shrinks them well.
+    # Streamed entries are sized only once written, so they are marked as ZIP64 up front in
+    # case they pass 2 GB.
+    with zipfile.ZipFile(path, "w", zipfile.ZIP_DEFLATED, compresslevel=1) as archive:
+        archive.writestr("manifest.json", json.dumps(manifest, indent=2))
+        with archive.open("data.csv", "w", force_zip64=True) as f, io.TextIOWrapper(f, encoding="utf-8", newline="") as text:
+            write_csv_chunks(boot.data, text)
+        for name, array in zip(BOOTSTRAP_ARRAYS, (boot.indices, boot.oob_indptr, boot.oob_indices)):
+            with archive.open(f"{name}.npy", "w", force_zip64=True) as f:
+                np.save(f, array)
+
+def load_bootstrap_archive(path):
+    """The BootstrapReplicates and the manifest of an archive written by write_bootstrap_archive()."""
+    with zipfile.ZipFile(path) as archive:
+        manifest = json.loads(archive.read("manifest.json"))
+        with archive.open("data.csv") as f:
+            data = pd.read_csv(f)
+        arrays = []
+        for name in BOOTSTRAP_ARRAYS:
+            with archive.open(f"{name}.npy") as f:
+                arrays.append(np.load(io.BytesIO(f.read())))
+    return BootstrapReplicates(data, *arrays), manifest
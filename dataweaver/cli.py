@@ -0,0 +1,357 @@
+"""Command line interface: python -m dataweaver <command> ...
+
+Only argparse is imported up front; the parser imports the constants its defaults come
+from, and each command the rest of the modules it needs, so Streamlit is never imported.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+def _write_csv(df, path):
+    from .export import write_csv_chunks
+
+    _make_parent(path)
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        write_csv_chunks(df, f)
+
+def _make_parent(path):
+    parent = os.path.dirname(path)
+    if parent:
+        os.makedirs(parent, exist_ok=True)
+
+def _report(rows, path, started, seed=None):
+    seeded = "" if seed is None else f" (seed {seed})"
+    print(f"Wrote {rows:,} rows to {path}{seeded} in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+def _check_fields(fields, columns):
+    missing = [field for field in fields if field not in columns]
+    if missing:
+        raise ValueError(f"unknown field(s) {', '.join(missing)}; available: {', '.join(map(str, columns))}")
+
+def _resolve_dataset(name):
+    """A dataset given as a path, or as a catalog key such as Classification/iris_data.csv."""
+    from .datasets import DATASETS_DIR
+
+    if os.path.exists(name):
+        return name
+    candidate = os.path.join(DATASETS_DIR, name)
+    if os.path.exists(candidate):
+        return candidate
+    raise ValueError(f"no such dataset: {name}")
+
+def _generate(kind, source, fields, args):
+    """Write args.rows rows to args.output, as one file or, with --workers, as parallel shards."""
+    from .parallel import GENERATORS, generate_sharded
+    from .rng import new_seed
+
+    _make_parent(args.output)
+    seed = new_seed() if args.seed is None else args.seed
+    started = time.perf_counter()
+    if args.workers:
+        manifest = generate_sharded(kind, source, fields, args.rows, args.output, seed=seed,
+                                    workers=args.workers, shard_rows=args.shard_rows)
+        _report(args.rows, manifest, started, seed)
+        return
+    GENERATORS[kind](source, fields, args.rows, args.output, seed=seed)
+    _report(args.rows, args.output, started, seed)
+
+def resample(args):
+    from .datasets import dataset_columns, load_dataset
+    from .synthetic import fit_synthetic_model, parse_template
+
+    columns = dataset_columns(args.source)
+    fields = args.fields or columns
+    _check_fields(fields, columns)
+    if args.synthetic:
+        model = dict(fit_synthetic_model(args.source))
+        for option in args.template:
+            field, _, template = option.partition("=")
+            _check_fields([field], columns)
+            model[field] = parse_template(template)
+        _generate("synthetic", model, fields, args)
+    else:
+        _generate("resample", load_dataset(args.source, fields), fields, args)
+
+def sample(args):
+    from .datasets import dataset_columns, label_column_for
+    from .rng import new_seed
+    from .sampling import sample_dataset
+
+    path = _resolve_dataset(args.dataset)
+    columns = dataset_columns(path)
+    fields = args.fields or columns
+    _check_fields(fields, columns)
+    label_column = None
+    if args.mode == "transactions":
+        from .baskets import basket_layout
+
+        if basket_layout(path) is None:
+            raise ValueError(f"{path} is not a basket (Association) dataset")
+    elif args.mode != "random":
+        task = os.path.basename(os.path.dirname(os.path.abspath(path)))
+        label_column = args.label or label_column_for(task, columns)
+        if label_column is None:
+            raise ValueError(f"{path} has no known label column; pass --label")
+        _check_fields([label_column], columns)
+    seed = new_seed() if args.seed is None else args.seed
+    started = time.perf_counter()
+    rows = sample_dataset(path, fields, args.rows, seed, None if args.mode == "random" else args.mode, label_column)
+    _write_csv(rows, args.output)
+    _report(len(rows), args.output, started, seed)
+
+def trim(args):
+    from .rng import new_seed
+    from .sampling import read_csv_columns, reservoir_sample_csv
+
+    columns = read_csv_columns(args.source)
+    fields = args.fields or list(columns)
+    _check_fields(fields, columns)
+    seed = new_seed() if args.seed is None else args.seed
+    started = time.perf_counter()
+    rows, total = reservoir_sample_csv(args.source, fields, args.rows, replace=args.replace, seed=seed)
+    _write_csv(rows, args.output)
+    if len(rows) < args.rows:
+        print(f"{args.source} has {total:,} rows, so all of them were kept", file=sys.stderr)
+    _report(len(rows), args.output, started, seed)
+
+def clusters(args):
+    from .clusters import fit_cluster_model
+    from .datasets import dataset_columns
+
+    path = _resolve_dataset(args.dataset)
+    columns = dataset_columns(path)
+    label_column = args.label or columns[-1]
+    fields = list(args.fields or columns)
+    _check_fields(fields + [label_column], columns)
+    if label_column not in fields:
+        fields.append(label_column)
+    _generate("clusters", fit_cluster_model(path, label_column), fields, args)
+
+def copula(args):
+    from .copula import fit_copula_model
+    from .datasets import dataset_columns
+
+    path = _resolve_dataset(args.dataset)
+    columns = dataset_columns(path)
+    fields = list(args.fields or columns)
+    _check_fields(fields, columns)
+    _generate("copula", fit_copula_model(path), fields, args)
+
+def bootstrap(args):
+    from .bootstrap import MAX_BOOTSTRAP_POSITIONS, bootstrap_replicates, write_bootstrap_archive
+    from .datasets import dataset_columns, file_digest, load_dataset
+    from .rng import new_seed, seeded_rng
+
+    if args.replicates < 1 or (args.size is not None and args.size < 1):
+        raise ValueError("--replicates and --size must be at least 1")
+    path = _resolve_dataset(args.dataset)
+    columns = dataset_columns(path)
+    fields = args.fields or columns
+    _check_fields(fields, columns)
+    seed = new_seed() if args.seed is None else args.seed
+    started = time.perf_counter()
+    dataset = load_dataset(path, fields)
+    size = len(dataset) if args.size is None else args.size
+    if args.replicates * size > MAX_BOOTSTRAP_POSITIONS:
+        raise ValueError(f"{args.replicates:,} replicates of {size:,} rows draw more than {MAX_BOOTSTRAP_POSITIONS:,} rows; "
+                         f"use at most {max(1, MAX_BOOTSTRAP_POSITIONS // max(size, 1)):,} replicates")
+    boot = bootstrap_replicates(dataset, args.replicates, seeded_rng(seed), size)
+    _make_parent(args.output)
+    write_bootstrap_archive(boot, args.output, {"source": path, "sha256": file_digest(path), "seed": seed})
+    print(f"Wrote {len(boot):,} replicates of {boot.indices.shape[1]:,} rows to {args.output} (seed {seed}) "
+          f"in {time.perf_counter() - started:.2f}s", file=sys.stderr)
+
+def rules(args):
+    from .specs import compile_field_specs, specs_from_json
+
+    with open(args.spec, encoding="utf-8") as f:
+        specs = specs_from_json(f.read())
+    _generate("synthetic", compile_field_specs(specs), [spec["name"] for spec in specs], args)
+
+def mine(args):
+    import pandas as pd
+
+    from .baskets import basket_layout, layout_fields
+    from .itemsets import compare_rules, dataset_rules, sample_rules
+
+    path = _resolve_dataset(args.dataset)
+    layout = basket_layout(path)
+    if layout is None:
+        raise ValueError(f"{path} is not a basket (Association) dataset")
+    thresholds = (args.min_support, args.min_confidence, args.max_size)
+    rules = dataset_rules(path, layout, *thresholds)
+    if args.sample:
+        sample = pd.read_csv(args.sample)
+        items = [item for item in layout.get("one_hot", []) if item in sample.columns]
+        if items:
+            layout = {"one_hot": items}
+            rules = dataset_rules(path, layout, *thresholds)
+        generated = sample_rules(sample, layout, *thresholds)
+        if generated is None:
+            raise ValueError(f"{args.sample} lacks the basket columns {', '.join(map(str, layout_fields(layout)))}")
+        rules = compare_rules(rules, generated)
+        status = rules["status"].value_counts()
+        print(f"{status.get('kept', 0):,} rules kept, {status.get('lost', 0):,} lost and {status.get('new', 0):,} new "
+              f"in {args.sample}", file=sys.stderr)
+    if args.output:
+        _write_csv(rules, args.output)
+        print(f"Wrote {len(rules):,} rules to {args.output}", file=sys.stderr)
+    else:
+        with pd.option_context("display.width", 160, "display.max_rows", 50, "display.max_colwidth", 40):
+            print(rules)
+
+def overview(args):
+    import pandas as pd
+
+    from .export import CSV_CHUNK_ROWS
+    from .stats import StreamingSummary
+
+    columns = list(pd.read_csv(args.source, nrows=0).columns)
+    fields = args.fields or columns
+    _check_fields(fields, columns)
+    # The file is summarized one chunk at a time, so its size does not matter
+    summary, rows, head, dtypes = StreamingSummary(), 0, None, None
+    for chunk in pd.read_csv(args.source, usecols=fields, chunksize=CSV_CHUNK_ROWS):
+        chunk = chunk[fields]
+        if head is None:
+            head, dtypes = chunk.head(), [str(dtype) for dtype in chunk.dtypes]
+        summary.update(chunk)
+        rows += len(chunk)
+    describe = summary.describe()
+
+    if args.json:
+        print(json.dumps({
+            "shape": [rows, len(fields)],
+            "columns": fields,
+            "dtypes": dtypes,
+            "describe": json.loads(describe.to_json(orient="split")),
+        }, indent=2))
+        return
+    with pd.option_context("display.width", 120, "display.max_columns", 20):
+        print(f"Shape: {rows:,} rows x {len(fields)} columns\n")
+        print("Data types:")
+        print(pd.Series(dtypes, index=fields).to_string(), "\n")
+        print("Summary statistics:")
+        print(describe, "\n")
+        print("Head:")
+        print(head if head is not None else "(no rows)")
+
+def catalog(args):
+    from .datasets import update_catalog
+
+    for key, entry in update_catalog().items():
+        print(f"{key}\t{entry['rows']} rows\t{len(entry['columns'])} columns\tlabel: {entry['label_column'] or '-'}")
+
+def build_parser():
+    from .export import CSV_CHUNK_ROWS
+    from .parallel import SHARD_ROWS
+
+    parser = argparse.ArgumentParser(prog="dataweaver", description="Generate, sample and trim datasets without the web app.")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    def add_output(command):
+        command.add_argument("-n", "--rows", type=int, required=True, help="number of rows to write")
+        command.add_argument("-o", "--output", required=True, help="CSV file to write")
+        command.add_argument("--seed", type=int, help="random seed; the same seed gives the same output (default: a new "
+                                                      "seed, which is reported)")
+
+    def add_sharding(command):
+        command.add_argument("--workers", type=int, metavar="N",
+                             help="generate in N processes, writing OUTPUT-00000.csv, ... and OUTPUT.manifest.json; "
+                                  "the files are the same for a given seed whatever N is")
+        command.add_argument("--shard-rows", type=int, default=SHARD_ROWS, metavar="ROWS",
+                             help=f"rows per shard file with --workers, a multiple of {CSV_CHUNK_ROWS} (default: {SHARD_ROWS})")
+
+    command = commands.add_parser("resample", help="resample rows of a CSV with replacement (the Automatic generator)")
+    command.add_argument("source", nargs="?", default="data.csv", help="CSV file to resample (default: data.csv)")
+    command.add_argument("--fields", nargs="+", help="fields to keep (default: all)")
+    command.add_argument("--synthetic", action="store_true", help="draw new values from distributions fitted to each field")
+    command.add_argument("--template", action="append", default=[], metavar="FIELD=TEMPLATE",
+                         help="with --synthetic, generate FIELD from a template such as '(999) 999-9999'")
+    add_output(command)
+    add_sharding(command)
+    command.set_defaults(handler=resample)
+
+    command = commands.add_parser("sample", help="sample rows of an ML dataset, stratified by class or by whole transaction")
+    command.add_argument("dataset", help="CSV path, or a catalog key such as Classification/iris_data.csv")
+    command.add_argument("--fields", nargs="+", help="fields to keep (default: all)")
+    command.add_argument("--mode", choices=("random", "stratified", "balanced", "smote", "transactions"),
+                         default="random", help="smote balances the classes with interpolated rows instead of repeats; "
+                         "with transactions, -n counts whole transactions of an Association dataset")
+    command.add_argument("--label", help="label column for stratified/balanced/smote sampling (default: detected)")
+    add_output(command)
+    command.set_defaults(handler=sample)
+
+    command = commands.add_parser("clusters", help="draw new points from a Gaussian fitted to each cluster of a dataset")
+    command.add_argument("dataset", help="CSV path, or a catalog key such as Clustering/clustered_data_3.csv")
+    command.add_argument("--fields", nargs="+", help="fields to keep (default: all); the cluster column is always kept")
+    command.add_argument("--label", help="cluster column (default: the last column)")
+    add_output(command)
+    add_sharding(command)
+    command.set_defaults(handler=clusters)
+
+    command = commands.add_parser("copula", help="draw new correlated rows from a Gaussian copula fitted to a dataset")
+    command.add_argument("dataset", help="CSV path, or a catalog key such as Regression/house_price_data.csv")
+    command.add_argument("--fields", nargs="+", help="fields to keep (default: all)")
+    add_output(command)
+    add_sharding(command)
+    command.set_defaults(handler=copula)
+
+    command = commands.add_parser("bootstrap", help="draw bootstrap replicates of a dataset as one archive of row indices")
+    command.add_argument("dataset", help="CSV path, or a catalog key such as Classification/diabetes_data.csv")
+    command.add_argument("--fields", nargs="+", help="fields to keep (default: all)")
+    command.add_argument("-B", "--replicates", type=int, default=100, help="number of replicates (default: 100)")
+    command.add_argument("--size", type=int, help="rows per replicate (default: the rows of the dataset)")
+    command.add_argument("-o", "--output", required=True,
+                         help="ZIP archive to write: data.csv, indices.npy, oob_indptr.npy, oob_indices.npy, manifest.json")
+    command.add_argument("--seed", type=int, help="random seed; the same seed gives the same replicates (default: a new "
+                                                  "seed, which is reported)")
+    command.set_defaults(handler=bootstrap)
+
+    command = commands.add_parser("trim", help="sample rows of a CSV of any size in one chunked pass")
+    command.add_argument("source", help="CSV file to trim")
+    command.add_argument("--fields", nargs="+", help="fields to keep (default: all)")
+    command.add_argument("--replace", action="store_true", help="sample with replacement (rows may repeat)")
+    add_output(command)
+    command.set_defaults(handler=trim)
+
+    command = commands.add_parser("rules", help="generate rows from a JSON rules file saved by the Custom generator")
+    command.add_argument("spec", help="rules (JSON) file")
+    add_output(command)
+    add_sharding(command)
+    command.set_defaults(handler=rules)
+
+    command = commands.add_parser("mine", help="mine the association rules of a basket dataset, or compare them with a sample's")
+    command.add_argument("dataset", help="CSV path, or a catalog key such as Association/groceries_data.csv")
+    command.add_argument("--sample", help="CSV sample of the dataset whose rules are compared with the dataset's")
+    command.add_argument("--min-support", type=float, default=0.005, help="minimum share of transactions (default: 0.005)")
+    command.add_argument("--min-confidence", type=float, default=0.1, help="minimum confidence (default: 0.1)")
+    command.add_argument("--max-size", type=int, default=3, help="largest itemset (default: 3)")
+    command.add_argument("-o", "--output", help="CSV file to write the rules to (default: print them)")
+    command.set_defaults(handler=mine)
+
+    command = commands.add_parser("overview", help="print the shape, data types and summary statistics of a CSV")
+    command.add_argument("source", help="CSV file to describe")
+    command.add_argument("--fields", nargs="+", help="fields to describe (default: all)")
+    command.add_argument("--json", action="store_true", help="print the overview as JSON")
+    command.set_defaults(handler=overview)
+
+    command = commands.add_parser("catalog", help="refresh the catalog manifest and Arrow caches of the bundled datasets")
+    command.set_defaults(handler=catalog)
+    return parser
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    if getattr(args, "rows", 1) < 1:
+        parser.error("--rows must be at least 1")
+    if getattr(args, "workers", None) is not None and (args.workers < 1 or args.shard_rows < 1):
+        parser.error("--workers and --shard-rows must be at least 1")
+    try:
+        args.handler(args)
+    except (OSError, ValueError) as error:
+        print(f"dataweaver: error: {error}", file=sys.stderr)
+        return 1
+    return 0
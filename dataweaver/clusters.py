@@ -0,0 +1,128 @@
+"""Cluster-preserving synthetic data: new points drawn from a Gaussian fitted to each cluster."""
+import functools
+
+import numpy as np
+import pandas as pd
+
+from .datasets import file_digest, load_dataset
+from .export import CSV_CHUNK_ROWS, stream_frames_to_csv
+from .synthetic import fit_categorical, sample_column
+
+# Decimal places tried when inferring how a float column is rounded
+MAX_DECIMALS = 6
+
+def column_decimals(values):
+    """The fewest decimal places that represent every value of a float column."""
+    values = values[np.isfinite(values)]
+    for decimals in range(MAX_DECIMALS + 1):
+        if np.allclose(np.round(values, decimals), values, rtol=0, atol=1e-9):
+            return decimals
+    return None
+
+def _one_hot_groups(dataset, columns):
+    """Boolean columns sharing a prefix (species_a, species_b, ...) with exactly one set per row."""
+    prefixes = {}
+    for column in columns:
+        if dataset[column].dtype == bool and "_" in str(column):
+            prefixes.setdefault(str(column).rsplit("_", 1)[0], []).append(column)
+    return [group for group in prefixes.values() if len(group) > 1 and (dataset[group].sum(axis=1) == 1).all()]
+
+def _gaussian_factor(values):
+    """Mean and a matrix A with A @ A.T equal to the covariance of the rows of values.
+
+    The factor comes from an eigendecomposition with negative eigenvalues clipped, so
+    constant columns and clusters with fewer rows than columns (singular covariances)
+    still give a valid factor, where a Cholesky decomposition would fail.
+    """
+    mean = values.mean(axis=0)
+    if len(values) < 2:
+        return mean, np.zeros((len(mean), len(mean)))
+    eigenvalues, eigenvectors = np.linalg.eigh(np.atleast_2d(np.cov(values, rowvar=False)))
+    return mean, eigenvectors * np.sqrt(np.clip(eigenvalues, 0, None))
+
+@functools.lru_cache(maxsize=16)
+def _fit_cluster_model(path, digest, label_column):
+    dataset = load_dataset(path)
+    features = [column for column in dataset.columns if column != label_column]
+    groups = _one_hot_groups(dataset, features)
+    grouped = {column for group in groups for column in group}
+    numeric = [column for column in features if column not in grouped and dataset[column].dtype != bool
+               and pd.api.types.is_numeric_dtype(dataset[column])]
+    # Remaining columns (booleans outside a one-hot group, text) get per-cluster frequencies
+    categorical = [column for column in features if column not in grouped and column not in numeric]
+
+    values = dataset[numeric].to_numpy(dtype=float)
+    integer = [pd.api.types.is_integer_dtype(dataset[column]) for column in numeric]
+    model = {
+        "columns": list(dataset.columns),
+        "label": label_column,
+        "numeric": numeric,
+        "decimals": [0 if is_integer else column_decimals(values[:, i]) for i, is_integer in enumerate(integer)],
+        "low": np.nanmin(values, axis=0) if len(values) else np.zeros(len(numeric)),
+        "high": np.nanmax(values, axis=0) if len(values) else np.zeros(len(numeric)),
+        "one_hot": groups,
+        "categorical": categorical,
+        "clusters": [],
+    }
+    labels = dataset[label_column]
+    counts = labels.value_counts(sort=False, dropna=True).sort_index()
+    for label, count in counts.items():
+        rows = (labels == label).to_numpy()
+        mean, factor = _gaussian_factor(values[rows][~np.isnan(values[rows]).any(axis=1)])
+        model["clusters"].append({
+            "label": label,
+            "mean": mean,
+            "factor": factor,
+            "one_hot": [dataset.loc[rows, group].to_numpy().mean(axis=0).cumsum() for group in groups],
+            "categorical": {column: fit_categorical(dataset.loc[rows, column]) for column in categorical},
+        })
+    model["cumulative"] = np.cumsum(counts.to_numpy()) / counts.sum()
+    return model
+
+def fit_cluster_model(path, label_column):
+    """Fit each cluster of a dataset, once per content hash and label column.
+
+    Numeric columns get the mean and covariance of the cluster's rows (kept as a factor of
+    the covariance, so sampling is one matrix product). One-hot boolean groups and other
+    columns are modelled per cluster by their frequencies, independently of the rest.
+    """
+    return _fit_cluster_model(path, file_digest(path), label_column)
+
+def sample_clusters(model, fields, size, rng):
+    """Draw size new points, each from a cluster picked with its share of the source rows.
+
+    Points are drawn a whole cluster at a time: standard normal draws times the cluster's
+    covariance factor, plus its mean. Numbers are clipped to the observed range of their
+    column and rounded as the column is (integers stay integers).
+    """
+    clusters = model["clusters"]
+    picks = np.minimum(np.searchsorted(model["cumulative"], rng.random(size), side="right"), len(clusters) - 1)
+    numbers = np.empty((size, len(model["numeric"])))
+    one_hot = [np.zeros((size, len(group)), dtype=bool) for group in model["one_hot"]]
+    categorical = {column: np.empty(size, dtype=object) for column in model["categorical"]}
+    for index, cluster in enumerate(clusters):
+        rows = np.flatnonzero(picks == index)
+        if not len(rows):
+            continue
+        numbers[rows] = cluster["mean"] + rng.standard_normal((len(rows), len(cluster["mean"]))) @ cluster["factor"].T
+        for group, cumulative in zip(one_hot, cluster["one_hot"]):
+            chosen = np.minimum(np.searchsorted(cumulative, rng.random(len(rows)), side="right"), group.shape[1] - 1)
+            group[rows, chosen] = True
+        for column, column_model in cluster["categorical"].items():
+            categorical[column][rows] = sample_column(column_model, len(rows), rng)
+
+    numbers = np.clip(numbers, model["low"], model["high"])
+    columns = {model["label"]: np.array([cluster["label"] for cluster in clusters])[picks]}
+    for i, (column, decimals) in enumerate(zip(model["numeric"], model["decimals"])):
+        columns[column] = np.rint(numbers[:, i]).astype(np.int64) if decimals == 0 else (
+            numbers[:, i] if decimals is None else np.round(numbers[:, i], decimals))
+    for group, values in zip(model["one_hot"], one_hot):
+        columns.update(zip(group, values.T))
+    columns.update(categorical)
+    return pd.DataFrame({field: columns[field] for field in fields})
+
+def stream_clusters_to_csv(model, fields, num_rows, path, seed=None, chunk_rows=CSV_CHUNK_ROWS, progress=None, summary=None,
+                           offset=0):
+    """Write num_rows cluster-preserving points to a CSV file with stream_frames_to_csv(); returns the seed."""
+    return stream_frames_to_csv(lambda first, size, rng: sample_clusters(model, fields, size, rng), fields, num_rows, path,
+                                seed, chunk_rows, progress, summary, offset)
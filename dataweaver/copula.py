@@ -0,0 +1,159 @@
+"""Correlated synthetic rows from a Gaussian copula: empirical marginals joined by rank correlation.
+
+Every column is mapped to normal scores (the standard normal quantile of its rank), and
+the correlation of those scores ties the columns together. New rows are correlated normal
+draws, one matrix product with the Cholesky factor of that correlation, which are mapped
+back through each column's empirical quantile function. Marginals are reproduced, and so
+are monotone relationships such as the one between median_income and median_house_value.
+"""
+import functools
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+from .clusters import column_decimals
+from .datasets import file_digest, load_dataset
+from .export import CSV_CHUNK_ROWS, stream_frames_to_csv
+from .synthetic import fit_categorical
+
+# Each numeric column's quantile function is tabulated at SCORE_KNOTS evenly spaced normal
+# scores from -SCORE_LIMIT to SCORE_LIMIT, so a lookup is an index computation rather than
+# a search. Scores beyond the grid (about 1 draw in 3.5 million) take the column's extremes.
+SCORE_KNOTS = 4096
+SCORE_LIMIT = 5.0
+# Smallest eigenvalue kept when the rank correlation matrix is not positive definite
+MIN_EIGENVALUE = 1e-6
+
+_normal = NormalDist()
+_normal_quantile = np.vectorize(_normal.inv_cdf, otypes=[float])
+_normal_cdf = np.vectorize(_normal.cdf, otypes=[float])
+
+def normal_scores(ranks, count):
+    """The standard normal quantiles of ranks 1..count (ties averaged), computed once per distinct rank."""
+    distinct, inverse = np.unique(ranks, return_inverse=True)
+    return _normal_quantile(distinct / (count + 1))[inverse]
+
+def _fit_numeric_marginal(series):
+    """The quantile function of a numeric column on the score grid, plus its share of missing values."""
+    observed = np.sort(series.dropna().to_numpy(dtype=float))
+    if not len(observed):
+        observed = np.array([np.nan])
+    # The empirical quantile function, with the k-th smallest value at probability (k + 0.5) / n
+    positions = (np.arange(len(observed)) + 0.5) / len(observed)
+    grid = np.linspace(-SCORE_LIMIT, SCORE_LIMIT, SCORE_KNOTS)
+    integer = pd.api.types.is_integer_dtype(series)
+    return {
+        "kind": "numeric",
+        "values": np.interp(_normal_cdf(grid), positions, observed),
+        "integer": integer,
+        "decimals": 0 if integer else column_decimals(observed),
+        "missing": float(series.isna().mean()),
+    }
+
+def quantile_lookup(values, scores):
+    """Linear interpolation of a column's tabulated quantile function at the given normal scores."""
+    positions = (scores + SCORE_LIMIT) * ((SCORE_KNOTS - 1) / (2 * SCORE_LIMIT))
+    np.clip(positions, 0, SCORE_KNOTS - 1, out=positions)
+    lower = np.minimum(positions.astype(np.intp), SCORE_KNOTS - 2)
+    positions -= lower
+    return values[lower] + positions * (values[lower + 1] - values[lower])
+
+def _fit_categorical_marginal(series):
+    """Categories by descending frequency, split at the normal scores of their cumulative shares."""
+    model = fit_categorical(series)
+    cumulative = np.clip(model["cumulative"][:-1], 1e-12, 1 - 1e-12)
+    model["thresholds"] = _normal_quantile(cumulative)
+    return model
+
+def _rank_codes(series, marginal):
+    """Values that order a column as the copula does: numbers as they are, categories by frequency."""
+    if marginal["kind"] == "numeric":
+        return series
+    codes = {value: code for code, value in enumerate(marginal["values"])}
+    return series.map(lambda value: codes.get(value, len(codes)))
+
+@functools.lru_cache(maxsize=16)
+def _fit_copula_model(path, digest):
+    dataset = load_dataset(path)
+    marginals = {}
+    scores = np.zeros((len(dataset), len(dataset.columns)))
+    for i, column in enumerate(dataset.columns):
+        series = dataset[column]
+        numeric = pd.api.types.is_numeric_dtype(series) and series.dtype != bool
+        marginals[column] = _fit_numeric_marginal(series) if numeric else _fit_categorical_marginal(series)
+        ranks = _rank_codes(series, marginals[column]).rank(method="average").to_numpy()
+        observed = ~np.isnan(ranks)
+        # Missing values score 0, the median, so they add nothing to any correlation
+        scores[observed, i] = normal_scores(ranks[observed], int(observed.sum()))
+
+    with np.errstate(invalid="ignore", divide="ignore"):
+        correlation = np.atleast_2d(np.corrcoef(scores, rowvar=False))
+    # A constant column has no correlation with anything
+    correlation = np.nan_to_num(correlation)
+    np.fill_diagonal(correlation, 1.0)
+    return {"columns": list(dataset.columns), "marginals": marginals, "correlation": _positive_definite(correlation)}
+
+def _positive_definite(correlation):
+    """The correlation matrix with its eigenvalues raised to MIN_EIGENVALUE, rescaled to a unit diagonal.
+
+    Columns that are exact functions of each other (or fewer rows than columns) leave the
+    matrix singular, where a Cholesky decomposition would fail.
+    """
+    eigenvalues, eigenvectors = np.linalg.eigh(correlation)
+    if eigenvalues.min() >= MIN_EIGENVALUE:
+        return correlation
+    repaired = (eigenvectors * np.maximum(eigenvalues, MIN_EIGENVALUE)) @ eigenvectors.T
+    scale = np.sqrt(np.diag(repaired))
+    return repaired / np.outer(scale, scale)
+
+def fit_copula_model(path):
+    """Fit the marginals and rank correlation of every column of a dataset, once per content hash.
+
+    Numeric columns keep their quantile function (tabulated on a grid of normal scores),
+    their rounding and their share of missing values (drawn independently). Other columns
+    keep the frequency of each value and are ranked by it. The correlation is that of the
+    columns' normal scores, a rank correlation.
+    """
+    return _fit_copula_model(path, file_digest(path))
+
+def copula_factor(model, fields):
+    """The Cholesky factor of the rank correlation of the selected fields."""
+    positions = [model["columns"].index(field) for field in fields]
+    return np.linalg.cholesky(model["correlation"][np.ix_(positions, positions)])
+
+def sample_copula(model, fields, size, rng, factor=None):
+    """Draw size new rows of the selected fields.
+
+    Correlated standard normal scores (standard normal draws times factor, by default
+    copula_factor(model, fields)) are looked up in each column's tabulated quantile
+    function, or among its category thresholds, and numbers keep their column's decimals.
+    """
+    factor = copula_factor(model, fields) if factor is None else factor
+    # One row of scores per field, so each column's lookup reads contiguous memory
+    scores = factor @ rng.standard_normal((len(fields), size))
+    columns = {}
+    for i, field in enumerate(fields):
+        marginal = model["marginals"][field]
+        if marginal["kind"] != "numeric":
+            columns[field] = marginal["values"][np.searchsorted(marginal["thresholds"], scores[i], side="right")]
+            continue
+        numbers = quantile_lookup(marginal["values"], scores[i])
+        if marginal["decimals"] is not None:
+            numbers = np.round(numbers, marginal["decimals"])
+        if marginal["missing"]:
+            numbers[rng.random(size) < marginal["missing"]] = np.nan
+        elif marginal["integer"]:
+            numbers = numbers.astype(np.int64)
+        columns[field] = numbers
+    return pd.DataFrame(columns)
+
+def stream_copula_to_csv(model, fields, num_rows, path, seed=None, chunk_rows=CSV_CHUNK_ROWS, progress=None, summary=None,
+                         offset=0):
+    """Write num_rows copula rows to a CSV file with stream_frames_to_csv(); returns the seed.
+
+    The Cholesky factor of the fields is computed once for the whole output.
+    """
+    factor = copula_factor(model, fields)
+    return stream_frames_to_csv(lambda first, size, rng: sample_copula(model, fields, size, rng, factor), fields, num_rows,
+                                path, seed, chunk_rows, progress, summary, offset)
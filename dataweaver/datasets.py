@@ -0,0 +1,271 @@
+"""Bundled datasets: the shared loader, its memory-mapped Arrow cache and the catalog manifest."""
+import functools
+import hashlib
+import json
+import os
+import tempfile
+import warnings
+
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from .stats import compute_overview, overview_from_json, overview_to_json
+
+# Bundled datasets and the on-disk columnar cache built from them
+DATASETS_DIR = "Datasets for ML"
+CACHE_DIR = ".datacache"
+CATALOG_PATH = os.path.join(CACHE_DIR, "catalog.json")
+# Bump when the manifest entry layout changes, so older manifests are rebuilt
+CATALOG_VERSION = 3
+
+# Display names for the bundled datasets; other files get a name derived from their file name
+DATASET_LABELS = {
+    "Classification/heart_disease_data.csv": "Heart Disease Dataset 🫀",
+    "Classification/diabetes_data.csv": "Diabetes Dataset 🩸",
+    "Classification/iris_data.csv": "Iris Dataset 🌸",
+    "Classification/acoustic_features_data.csv": "Acoustic Features Dataset 🎵",
+    "Regression/car_price_data.csv": "🚗 Car Price Dataset",
+    "Regression/electricity_data.csv": "⚡ Electricity Dataset",
+    "Regression/house_price_data.csv": "🏠 House Price Dataset",
+    "Clustering/clustered_data_1.csv": "📂 Sample Dataset 1",
+    "Clustering/clustered_data_2.csv": "📂 Sample Dataset 2",
+    "Clustering/clustered_data_3.csv": "📂 Sample Dataset 3",
+    "Association/bakery_data.csv": "🥖 Bakery Dataset",
+    "Association/basket_analysis_data.csv": "🛒 Basket Analysis Dataset",
+    "Association/groceries_data.csv": "🛍️ Groceries Dataset",
+}
+# Columns holding class labels in classification datasets (clustering datasets use their last column)
+LABEL_COLUMNS = ("target", "Outcome", "outcome", "Class", "Cluster")
+
+# Shared dataset loader: the app pages and the CLI read their CSV files through load_dataset()
+def file_digest(path):
+    """Return the SHA-256 of a file, re-hashing only when its mtime or size changes."""
+    stat = os.stat(path)
+    return _hash_file(path, stat.st_mtime_ns, stat.st_size)
+
+@functools.lru_cache(maxsize=256)
+def _hash_file(path, mtime_ns, size):
+    digest = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(1 << 20), b""):
+            digest.update(block)
+    return digest.hexdigest()
+
+def columnar_cache_path(path, digest):
+    """Return where the Arrow (Feather) copy of a bundled CSV with the given hash lives."""
+    relative = os.path.relpath(path, DATASETS_DIR)
+    stem = os.path.splitext(relative)[0].replace(os.sep, "__")
+    return os.path.join(CACHE_DIR, "columnar", f"{stem}-{digest[:16]}.arrow")
+
+def build_columnar_cache(path, digest):
+    """Parse a CSV once and store it as an uncompressed Arrow file next to older versions.
+
+    Stale copies of the same dataset are removed, and the file is written to a temporary
+    name first so a concurrent reader never maps a half-written cache.
+    """
+    target = columnar_cache_path(path, digest)
+    os.makedirs(os.path.dirname(target), exist_ok=True)
+    table = pa.Table.from_pandas(pd.read_csv(path), preserve_index=False)
+    temporary = _temporary_file(target)
+    try:
+        feather.write_feather(table, temporary, compression="uncompressed")
+        os.replace(temporary, target)
+    except BaseException:
+        _remove_quietly(temporary)
+        raise
+
+    prefix = os.path.basename(target).rsplit("-", 1)[0] + "-"
+    for name in os.listdir(os.path.dirname(target)):
+        stale = os.path.join(os.path.dirname(target), name)
+        if name.startswith(prefix) and name.endswith(".arrow") and stale != target:
+            _remove_quietly(stale)
+    return target
+
+def _temporary_file(target):
+    """A new, uniquely named empty file next to target, to be renamed over it once written.
+
+    Every builder gets its own file, so threads of one server process (which share a process
+    id) and separate processes never write to the same temporary path.
+    """
+    handle, temporary = tempfile.mkstemp(prefix=os.path.basename(target) + ".", suffix=".tmp",
+                                         dir=os.path.dirname(target) or ".")
+    os.close(handle)
+    return temporary
+
+def _remove_quietly(path):
+    try:
+        os.remove(path)
+    except OSError:
+        pass
+
+def _in_datasets_dir(path):
+    root = os.path.abspath(DATASETS_DIR)
+    return os.path.commonpath([root, os.path.abspath(path)]) == root
+
+@functools.lru_cache(maxsize=64)
+def _open_columnar(path, digest):
+    # The static catalog is served from a memory-mapped Arrow copy: numeric columns are
+    # zero-copy (and read-only) views of the mapped file instead of freshly parsed text.
+    cached = columnar_cache_path(path, digest)
+    if not os.path.exists(cached):
+        cached = build_columnar_cache(path, digest)
+    return feather.read_table(cached, memory_map=True)
+
+@functools.lru_cache(maxsize=64)
+def _parse_dataset(path, digest, columns):
+    if not _in_datasets_dir(path):
+        if columns is None:
+            return pd.read_csv(path)
+        return pd.read_csv(path, usecols=list(columns))[list(columns)]
+
+    table = _open_columnar(path, digest)
+    if columns is not None:
+        table = table.select(list(columns))
+    return table.to_pandas(split_blocks=True)
+
+@functools.lru_cache(maxsize=256)
+def _dataset_columns(path, digest):
+    if _in_datasets_dir(path):
+        return list(_open_columnar(path, digest).column_names)
+    return list(pd.read_csv(path, nrows=0).columns)
+
+def dataset_columns(path):
+    """Return a dataset's column names without parsing its rows."""
+    return _dataset_columns(path, file_digest(path))
+
+def load_dataset(path, columns=None):
+    """Load a CSV once per process and share the parsed frame across reruns and sessions.
+
+    When columns is given, only those columns are read (in that order): the Arrow cache
+    converts just the selected columns, and other CSV files are parsed with usecols.
+    The frame is cached by content hash, so editing or replacing the file invalidates it.
+    Every call returns a new frame over the shared data, and copy-on-write (always on from
+    pandas 3) copies any column the caller modifies, so no caller can change what later
+    callers get.
+    """
+    return _parse_dataset(path, file_digest(path), None if columns is None else tuple(columns)).copy(deep=False)
+
+@functools.lru_cache(maxsize=64)
+def _decode_overview(path, digest):
+    return overview_from_json(next(entry["overview"] for entry in load_catalog().values() if entry["path"] == path))
+
+def dataset_overview(entry):
+    """Return the precomputed overview of a catalog dataset, decoded once per content hash."""
+    return _decode_overview(entry["path"], entry["sha256"])
+
+# Dataset catalog manifest
+def _catalog_files():
+    files = []
+    for task in sorted(os.listdir(DATASETS_DIR)):
+        folder = os.path.join(DATASETS_DIR, task)
+        if os.path.isdir(folder):
+            files += [os.path.join(folder, name) for name in sorted(os.listdir(folder)) if name.lower().endswith(".csv")]
+    return files
+
+def _dataset_label(key):
+    if key in DATASET_LABELS:
+        return DATASET_LABELS[key]
+    stem = os.path.splitext(os.path.basename(key))[0]
+    if stem.endswith("_data"):
+        stem = stem[:-len("_data")]
+    return f"📂 {stem.replace('_', ' ').title()} Dataset"
+
+def label_column_for(task, columns):
+    """The column holding the class labels of a dataset for a task, or None."""
+    if task == "Clustering":
+        return columns[-1]
+    if task == "Classification":
+        return next((column for column in LABEL_COLUMNS if column in columns), None)
+    return None
+
+def profile_dataset(path, task, digest):
+    """Describe one catalog file: its columns, dtypes, size, hash and label column."""
+    dataset = load_dataset(path)
+    label_column = label_column_for(task, dataset.columns)
+    stat = os.stat(path)
+    return {
+        "path": path,
+        "task": task,
+        "columns": list(dataset.columns),
+        "dtypes": [str(dtype) for dtype in dataset.dtypes],
+        "rows": len(dataset),
+        "size": stat.st_size,
+        "mtime_ns": stat.st_mtime_ns,
+        "sha256": digest,
+        "label_column": label_column,
+        "classes": int(dataset[label_column].nunique()) if label_column is not None else None,
+        "overview": overview_to_json(compute_overview(dataset)),
+    }
+
+def update_catalog():
+    """Bring the manifest on disk up to date with DATASETS_DIR and return its entries.
+
+    Entries whose file size and mtime are unchanged are reused as they are; changed files
+    are re-hashed and only re-profiled when their content hash differs. Entries of deleted
+    files are dropped, and files that cannot be parsed are left out with a warning. The
+    manifest is only rewritten when something changed.
+    """
+    try:
+        with open(CATALOG_PATH, encoding="utf-8") as f:
+            manifest = json.load(f)
+        previous = manifest["datasets"] if manifest.get("version") == CATALOG_VERSION else {}
+    except (OSError, ValueError, KeyError):
+        previous = {}
+
+    datasets = {}
+    for path in _catalog_files():
+        key = os.path.relpath(path, DATASETS_DIR).replace(os.sep, "/")
+        entry, stat = previous.get(key), os.stat(path)
+        if entry is None or (entry["size"], entry["mtime_ns"]) != (stat.st_size, stat.st_mtime_ns):
+            digest = file_digest(path)
+            if entry is None or entry["sha256"] != digest:
+                try:
+                    entry = profile_dataset(path, key.split("/")[0], digest)
+                except (ValueError, pa.ArrowException) as error:
+                    warnings.warn(f"Leaving {path} out of the catalog: it could not be read ({error})", stacklevel=2)
+                    continue
+            entry = dict(entry, size=stat.st_size, mtime_ns=stat.st_mtime_ns)
+        datasets[key] = dict(entry, label=_dataset_label(key))
+
+    if datasets != previous:
+        os.makedirs(CACHE_DIR, exist_ok=True)
+        temporary = _temporary_file(CATALOG_PATH)
+        try:
+            with open(temporary, "w", encoding="utf-8") as f:
+                json.dump({"version": CATALOG_VERSION, "datasets": datasets}, f, indent=1, ensure_ascii=False)
+            os.replace(temporary, CATALOG_PATH)
+        except BaseException:
+            _remove_quietly(temporary)
+            raise
+    return datasets
+
+@functools.lru_cache(maxsize=4)
+def _load_catalog(signature):
+    return update_catalog()
+
+def load_catalog():
+    """Return the catalog manifest, refreshing it only when a catalog file was added, removed or touched."""
+    signature = []
+    for path in _catalog_files():
+        stat = os.stat(path)
+        signature.append((path, stat.st_mtime_ns, stat.st_size))
+    return _load_catalog(tuple(signature))
+
+def catalog_datasets(task, min_classes=None, max_classes=None):
+    """Return {display name: manifest entry} for the catalog datasets of one task.
+
+    Datasets without a label column have no number of classes, so they are left out
+    whenever min_classes or max_classes is given.
+    """
+    datasets = {}
+    order = list(DATASET_LABELS)
+    bounded = min_classes is not None or max_classes is not None
+    for key, entry in sorted(load_catalog().items(), key=lambda item: (order.index(item[0]) if item[0] in order else len(order), item[0])):
+        classes = entry["classes"]
+        if entry["task"] != task or (bounded and classes is None):
+            continue
+        if (min_classes is not None and classes < min_classes) or (max_classes is not None and classes > max_classes):
+            continue
+        datasets[entry["label"]] = entry
+    return datasets
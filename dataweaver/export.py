@@ -0,0 +1,110 @@
+"""Writing datasets to CSV files in bounded-memory chunks."""
+import os
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+from .rng import chunk_rngs, new_seed
+
+# Rows written per to_csv() call when exporting a dataset
+CSV_CHUNK_ROWS = 50_000
+
+# Large generated files are written here by the app
+OUTPUT_DIR = "generated"
+
+def write_csv_chunks(df, handle, chunk_rows=CSV_CHUNK_ROWS):
+    """Write a frame as CSV in row chunks so no full-size text copy is ever built."""
+    if df.empty:
+        df.to_csv(handle, index=False)
+        return
+    for start in range(0, len(df), chunk_rows):
+        df.iloc[start:start + chunk_rows].to_csv(handle, index=False, header=start == 0)
+
+# Large-scale generation
+def new_output_dir():
+    """Create a directory of its own inside OUTPUT_DIR, for one app session's files."""
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    return tempfile.mkdtemp(prefix="session-", dir=OUTPUT_DIR)
+
+def output_file_path(file_name, extension=".csv", directory=OUTPUT_DIR):
+    """Return a path inside directory for a user-supplied file name, ignoring any directories in it."""
+    os.makedirs(directory, exist_ok=True)
+    name = os.path.basename(file_name.strip())
+    if not name.lower().endswith(extension):
+        name += extension
+    return os.path.join(directory, name)
+
+def stream_chunks_to_csv(header, make_chunk, num_rows, path, seed, chunk_rows=CSV_CHUNK_ROWS, progress=None, offset=0):
+    """Write header, then make_chunk(first, size, rng) for successive chunks of num_rows rows, to a CSV file.
+
+    make_chunk returns the encoded CSV lines of the size rows starting at row first of the
+    whole output, drawn from rng, the stream of that chunk (see chunk_rngs()). Only one
+    chunk is ever held in memory whatever the output size. offset is the position of the
+    file's first row in the whole output, for outputs written in pieces.
+    """
+    with open(path, "wb") as f:
+        f.write(header)
+        for first, size, rng in chunk_rngs(seed, offset, num_rows, chunk_rows):
+            f.write(make_chunk(first, size, rng))
+            if progress is not None:
+                progress(first - offset + size)
+
+def stream_frames_to_csv(sample_chunk, fields, num_rows, path, seed=None, chunk_rows=CSV_CHUNK_ROWS, progress=None, summary=None,
+                         offset=0):
+    """Write num_rows rows of fields to a CSV file, one sampled frame at a time; returns the seed.
+
+    sample_chunk(first, size, rng) returns the frame of the size rows starting at row first
+    of the whole output, drawn from rng, the stream of seed for that chunk. The generators
+    that sample from a fitted model are written through this. Each chunk is also added to
+    summary (a StreamingSummary), when one is given; offset is as for stream_chunks_to_csv().
+    """
+    seed = new_seed() if seed is None else seed
+
+    def make_chunk(first, size, rng):
+        chunk = sample_chunk(first, size, rng)
+        if summary is not None:
+            summary.update(chunk)
+        return chunk.to_csv(index=False, header=False).encode("utf-8")
+
+    header = pd.DataFrame(columns=fields).to_csv(index=False).encode("utf-8")
+    stream_chunks_to_csv(header, make_chunk, num_rows, path, seed, chunk_rows, progress, offset)
+    return seed
+
+def stream_resample_to_csv(dataset, fields, num_rows, path, seed=None, chunk_rows=CSV_CHUNK_ROWS, progress=None, summary=None,
+                           offset=0):
+    """Write num_rows rows resampled with replacement from dataset[fields] to a CSV file; returns the seed.
+
+    Row indices are drawn in numpy chunks of chunk_rows and only the selected columns are
+    gathered, so memory stays bounded by the chunk size whatever the output size. When
+    every source row renders to a single CSV line, each line is encoded once and chunks
+    are written by gathering those lines instead of re-formatting values. Each chunk is
+    also added to summary (a StreamingSummary), when one is given.
+
+    Each chunk draws from its own stream of seed (a new seed when None), so the rows from
+    offset on can be regenerated without the rows before them.
+    """
+    seed = new_seed() if seed is None else seed
+    projected = dataset[fields]
+    lines = projected.to_csv(index=False, header=False).encode("utf-8").splitlines(keepends=True)
+    if len(lines) == len(projected):
+        lines = np.array(lines, dtype=object)
+
+        def make_chunk(first, size, rng):
+            indices = rng.integers(0, len(projected), size=size)
+            if summary is not None:
+                summary.update(projected.take(indices))
+            return b"".join(lines[indices])
+    else:
+        columns = {field: projected[field].to_numpy() for field in fields}
+
+        def make_chunk(first, size, rng):
+            indices = rng.integers(0, len(projected), size=size)
+            chunk = pd.DataFrame({field: column[indices] for field, column in columns.items()})
+            if summary is not None:
+                summary.update(chunk)
+            return chunk.to_csv(index=False, header=False).encode("utf-8")
+
+    header = projected.head(0).to_csv(index=False).encode("utf-8")
+    stream_chunks_to_csv(header, make_chunk, num_rows, path, seed, chunk_rows, progress, offset)
+    return seed
@@ -0,0 +1,134 @@
+"""Frequent itemsets and association rules, mined with Apriori over packed item bitsets.
+
+Each item is a bitset over the transactions of a BasketMatrix (bit t is set when
+transaction t holds the item), packed 8 transactions to a byte. The support of an itemset
+is the popcount of the AND of its items' bitsets, so a whole level of candidates sharing a
+prefix is counted with one vectorized AND and popcount.
+"""
+import functools
+import itertools
+import json
+import math
+
+import numpy as np
+import pandas as pd
+
+from .baskets import basket_layout, frame_baskets, layout_fields, load_baskets
+from .datasets import file_digest, load_dataset
+
+# Defaults of the rule preview: 0.5% support, 10% confidence, itemsets of up to 3 items. The
+# groceries baskets are small, so higher thresholds leave them with no rules at all.
+MIN_SUPPORT = 0.005
+MIN_CONFIDENCE = 0.1
+MAX_ITEMSET_SIZE = 3
+RULE_COLUMNS = ["antecedents", "consequents", "support", "confidence", "lift"]
+
+# Set bits in each byte value, for numpy versions without bitwise_count
+_BYTE_POPCOUNT = np.array([bin(value).count("1") for value in range(256)], dtype=np.uint16)
+
+def popcount(bitsets):
+    """Number of set bits in each row of a 2-D array of packed bytes."""
+    if hasattr(np, "bitwise_count"):
+        return np.bitwise_count(bitsets).sum(axis=-1, dtype=np.int64)
+    return _BYTE_POPCOUNT[bitsets].sum(axis=-1, dtype=np.int64)
+
+def item_bitsets(baskets):
+    """An (items x ceil(transactions / 8)) array of packed transaction bitsets, one row per item."""
+    matrix = np.zeros((len(baskets.items), len(baskets)), dtype=bool)
+    transactions = np.repeat(np.arange(len(baskets)), np.diff(baskets.indptr))
+    matrix[baskets.indices, transactions] = True
+    return np.packbits(matrix, axis=1)
+
+def frequent_itemsets(baskets, min_support=MIN_SUPPORT, max_size=MAX_ITEMSET_SIZE):
+    """{itemset (sorted tuple of item codes): transaction count} for itemsets with at least min_support.
+
+    Level k extends each frequent (k-1)-itemset by the frequent items after its last one
+    whose pairing with the itemset's prefix is frequent too (the Apriori join), counting all
+    extensions of one itemset at once.
+    """
+    if len(baskets) == 0:
+        return {}
+    min_count = max(1, math.ceil(min_support * len(baskets)))
+    bitsets = item_bitsets(baskets)
+    counts = popcount(bitsets)
+    singles = [int(item) for item in np.flatnonzero(counts >= min_count)]
+    level = {(item,): bitsets[item] for item in singles}
+    frequent = {itemset: int(counts[itemset[0]]) for itemset in level}
+
+    for size in range(2, max_size + 1):
+        next_level = {}
+        for itemset, bits in level.items():
+            # Extensions by items after the last one; every k-1 subset must be frequent
+            extensions = [item for item in singles if item > itemset[-1]
+                          and all(itemset[:i] + itemset[i + 1:] + (item,) in frequent for i in range(len(itemset)))]
+            if not extensions:
+                continue
+            joined = bits & bitsets[extensions]
+            joined_counts = popcount(joined)
+            for item, count, row in zip(extensions, joined_counts, joined):
+                if count >= min_count:
+                    next_level[itemset + (item,)] = row
+                    frequent[itemset + (item,)] = int(count)
+        if not next_level:
+            break
+        level = next_level
+    return frequent
+
+def association_rules(baskets, min_support=MIN_SUPPORT, min_confidence=MIN_CONFIDENCE, max_size=MAX_ITEMSET_SIZE):
+    """The rules A -> C of the frequent itemsets of baskets, as a frame with RULE_COLUMNS.
+
+    support is the share of transactions holding A and C, confidence the share of those
+    holding A that also hold C, and lift the confidence over the support of C. Items are
+    named and joined with ", ", sorted by name, so rules compare across datasets.
+    """
+    frequent = frequent_itemsets(baskets, min_support, max_size)
+    total = len(baskets)
+    records = []
+    for itemset, count in frequent.items():
+        for size in range(1, len(itemset)):
+            for antecedent in itertools.combinations(itemset, size):
+                consequent = tuple(item for item in itemset if item not in antecedent)
+                confidence = count / frequent[antecedent]
+                if confidence >= min_confidence:
+                    records.append((_names(baskets, antecedent), _names(baskets, consequent), count / total,
+                                    confidence, confidence * total / frequent[consequent]))
+    rules = pd.DataFrame(records, columns=RULE_COLUMNS)
+    return rules.sort_values(["lift", "confidence"], ascending=False, ignore_index=True)
+
+def _names(baskets, itemset):
+    return ", ".join(sorted(str(baskets.items[item]) for item in itemset))
+
+@functools.lru_cache(maxsize=32)
+def _dataset_rules(path, digest, layout_key, min_support, min_confidence, max_size):
+    layout = json.loads(layout_key)
+    if layout == basket_layout(path):
+        baskets = load_baskets(path)
+    else:
+        baskets = frame_baskets(load_dataset(path, layout_fields(layout)), layout)
+    return association_rules(baskets, min_support, min_confidence, max_size)
+
+def dataset_rules(path, layout, min_support=MIN_SUPPORT, min_confidence=MIN_CONFIDENCE, max_size=MAX_ITEMSET_SIZE):
+    """The association rules of a catalog basket dataset, mined once per content hash and thresholds.
+
+    layout is the dataset's layout, or for a one-hot dataset the layout of a subset of its
+    item columns. The rules are shared by every caller; each gets a copy-on-write view of them.
+    """
+    rules = _dataset_rules(path, file_digest(path), json.dumps(layout, sort_keys=True), min_support, min_confidence, max_size)
+    return rules.copy(deep=False)
+
+def sample_rules(sample, layout, min_support=MIN_SUPPORT, min_confidence=MIN_CONFIDENCE, max_size=MAX_ITEMSET_SIZE):
+    """The association rules of a frame of basket rows, or None when it lacks the layout's columns."""
+    if not set(layout_fields(layout)) <= set(sample.columns):
+        return None
+    return association_rules(frame_baskets(sample, layout), min_support, min_confidence, max_size)
+
+def compare_rules(source, sample):
+    """Join the rules of a dataset and of a sample of it, marking each as kept, lost or new.
+
+    A rule is kept when both have it, lost when only the source does and new when only the
+    sample does; the metrics of each side get a _source or _sample suffix.
+    """
+    joined = source.merge(sample, on=["antecedents", "consequents"], how="outer", suffixes=("_source", "_sample"),
+                          indicator=True)
+    joined.insert(2, "status", joined.pop("_merge").map({"both": "kept", "left_only": "lost", "right_only": "new"}))
+    return joined.sort_values(["status", "lift_source", "lift_sample"], ascending=[True, False, False], ignore_index=True)
@@ -0,0 +1,86 @@
+"""Minority oversampling by interpolation between nearest neighbours of the same class (SMOTE).
+
+A new row of a class lies on the segment between one of its rows and one of that row's
+nearest neighbours within the class. The neighbours of every row are found once per
+dataset, from blocked distance matrices, and cached, so drawing new rows is a handful of
+gathers and one vectorized interpolation however many are drawn.
+"""
+import functools
+
+import numpy as np
+import pandas as pd
+
+from .clusters import column_decimals
+from .datasets import file_digest, load_dataset
+
+# Neighbours each new row may be interpolated towards
+SMOTE_NEIGHBOURS = 5
+# Rows per block of the distance matrix, which holds BLOCK_ROWS x (rows of the class) distances
+BLOCK_ROWS = 1024
+
+def feature_columns(dataset, label_column):
+    """The columns distances are measured on: the numeric columns other than the label."""
+    return [column for column in dataset.columns if column != label_column and dataset[column].dtype != bool
+            and pd.api.types.is_numeric_dtype(dataset[column])]
+
+def nearest_neighbours(features, k):
+    """Positions of the k nearest other rows of each row of features, in no particular order.
+
+    Squared distances are computed a block of rows at a time as |a|^2 + |b|^2 - 2 a.b, so
+    memory stays at BLOCK_ROWS rows of the distance matrix. Rows with fewer than k others
+    repeat their neighbours; a lone row is its own neighbour.
+    """
+    count = min(k, len(features) - 1)
+    if count < 1:
+        return np.zeros((len(features), k), dtype=np.intp)
+    squared = np.einsum("ij,ij->i", features, features)
+    neighbours = np.empty((len(features), count), dtype=np.intp)
+    for start in range(0, len(features), BLOCK_ROWS):
+        block = features[start:start + BLOCK_ROWS]
+        distances = squared[start:start + len(block), None] + squared - 2 * block @ features.T
+        # A row is not its own neighbour
+        distances[np.arange(len(block)), np.arange(start, start + len(block))] = np.inf
+        neighbours[start:start + len(block)] = np.argpartition(distances, count - 1, axis=1)[:, :count]
+    return neighbours[:, np.arange(k) % count]
+
+@functools.lru_cache(maxsize=16)
+def _neighbour_index(path, digest, label_column, k):
+    dataset = load_dataset(path)
+    features = dataset[feature_columns(dataset, label_column)].to_numpy(dtype=float)
+    # Standardized, so no column dominates the distances by its units alone
+    scale = features.std(axis=0)
+    features = np.nan_to_num((features - features.mean(axis=0)) / np.where(scale > 0, scale, 1))
+    codes = pd.factorize(dataset[label_column])[0]
+    # Rows without a label are their own neighbours
+    neighbours = np.repeat(np.arange(len(dataset))[:, None], k, axis=1)
+    for code in range(codes.max(initial=-1) + 1):
+        rows = np.flatnonzero(codes == code)
+        neighbours[rows] = rows[nearest_neighbours(features[rows], k)]
+    return neighbours
+
+def neighbour_index(path, label_column, k=SMOTE_NEIGHBOURS):
+    """An array holding, for every row, the dataset positions of its k nearest rows of the same class.
+
+    Built once per content hash and label column; treat it as read-only.
+    """
+    return _neighbour_index(path, file_digest(path), label_column, k)
+
+def interpolate_rows(dataset, bases, neighbours, gaps):
+    """Rows between dataset rows bases and neighbours, at the given fractions of the way.
+
+    Numeric columns are interpolated and rounded as their column is (integers stay
+    integers); other columns are copied from the base rows.
+    """
+    rows = dataset.take(bases).reset_index(drop=True)
+    for column in dataset.columns:
+        values = dataset[column]
+        if values.dtype == bool or not pd.api.types.is_numeric_dtype(values):
+            continue
+        values = values.to_numpy(dtype=float)
+        numbers = values[bases] + gaps * (values[neighbours] - values[bases])
+        if pd.api.types.is_integer_dtype(dataset[column]):
+            rows[column] = np.rint(numbers).astype(dataset[column].dtype)
+        else:
+            decimals = column_decimals(values)
+            rows[column] = numbers if decimals is None else np.round(numbers, decimals)
+    return rows
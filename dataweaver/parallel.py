@@ -0,0 +1,106 @@
+"""Generating very large outputs as shards, written in parallel by a pool of processes."""
+import concurrent.futures
+import json
+import multiprocessing
+import os
+
+from .clusters import stream_clusters_to_csv
+from .copula import stream_copula_to_csv
+from .export import CSV_CHUNK_ROWS, stream_resample_to_csv
+from .rng import new_seed
+from .stats import StreamingSummary
+from .synthetic import stream_synthetic_to_csv
+
+# Rows per shard file, a multiple of CSV_CHUNK_ROWS. Every chunk draws from its own stream
+# of the seed, so the shards hold the same rows as a single file would, whatever the
+# number of workers.
+SHARD_ROWS = 1_000_000
+MANIFEST_VERSION = 1
+# The streaming writer of each kind of generator, by the name recorded in the manifest
+GENERATORS = {
+    "resample": stream_resample_to_csv,
+    "synthetic": stream_synthetic_to_csv,
+    "clusters": stream_clusters_to_csv,
+    "copula": stream_copula_to_csv,
+}
+
+# What each worker process generates from: (kind, source, fields), set once per process
+_worker_job = {}
+
+def shard_plan(num_rows, shard_rows=SHARD_ROWS):
+    """(offset, rows) of each shard of a num_rows-row output."""
+    return [(offset, min(shard_rows, num_rows - offset)) for offset in range(0, num_rows, shard_rows)]
+
+def shard_paths(path, count):
+    """Shard file paths and the manifest path for an output named path (e.g. out.csv)."""
+    stem = path[:-4] if path.lower().endswith(".csv") else path
+    return [f"{stem}-{index:05d}.csv" for index in range(count)], f"{stem}.manifest.json"
+
+def _init_worker(kind, source, fields):
+    _worker_job.update(kind=kind, source=source, fields=fields)
+
+def _write_shard(index, offset, rows, path, seed, summarize):
+    kind, source, fields = _worker_job["kind"], _worker_job["source"], _worker_job["fields"]
+    summary = StreamingSummary() if summarize else None
+    GENERATORS[kind](source, fields, rows, path, seed=seed, summary=summary, offset=offset)
+    return index, os.path.getsize(path), summary
+
+def generate_sharded(kind, source, fields, num_rows, path, seed=None, workers=None, shard_rows=SHARD_ROWS,
+                     progress=None, summary=None):
+    """Write num_rows generated rows as CSV shards plus a JSON manifest; returns the manifest path.
+
+    kind names one of GENERATORS, and source is what that writer generates from: the dataset
+    to resample, a column model, a cluster model or a copula model. Concatenated, the shards
+    hold the rows that a single file written with the same seed would, whatever the number
+    of workers. A random seed is drawn and recorded in the manifest when none is given.
+    progress, if given, is called with the number of rows written so far as shards finish;
+    summary (a StreamingSummary) is merged with each shard's summary, in shard order.
+    """
+    if kind not in GENERATORS:
+        raise ValueError(f"Unknown generator {kind!r}; expected one of {', '.join(GENERATORS)}.")
+    if shard_rows % CSV_CHUNK_ROWS:
+        raise ValueError(f"Shards must hold a multiple of {CSV_CHUNK_ROWS:,} rows.")
+    seed = new_seed() if seed is None else seed
+    plan = shard_plan(num_rows, shard_rows)
+    paths, manifest_path = shard_paths(path, len(plan))
+    workers = max(1, min(workers or os.cpu_count() or 1, len(plan)))
+    jobs = [(index, offset, rows, shard_path, seed, summary is not None)
+            for index, ((offset, rows), shard_path) in enumerate(zip(plan, paths))]
+
+    results, done = [None] * len(plan), 0
+    if workers == 1:
+        _init_worker(kind, source, fields)
+        finished = (_write_shard(*job) for job in jobs)
+    else:
+        # Spawned rather than forked: forking a threaded process (like the Streamlit server) is unsafe
+        pool = concurrent.futures.ProcessPoolExecutor(workers, mp_context=multiprocessing.get_context("spawn"),
+                                                      initializer=_init_worker, initargs=(kind, source, fields))
+        finished = (future.result() for future in
+                    concurrent.futures.as_completed([pool.submit(_write_shard, *job) for job in jobs]))
+    try:
+        for index, size, shard_summary in finished:
+            results[index] = (size, shard_summary)
+            done += plan[index][1]
+            if progress is not None:
+                progress(done)
+    finally:
+        if workers > 1:
+            pool.shutdown(cancel_futures=True)
+
+    if summary is not None:
+        for _, shard_summary in results:
+            summary.merge(shard_summary)
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "generator": kind,
+        "fields": list(fields),
+        "rows": num_rows,
+        "seed": seed,
+        "chunk_rows": CSV_CHUNK_ROWS,
+        "shard_rows": shard_rows,
+        "shards": [{"file": os.path.basename(shard_path), "offset": offset, "rows": rows, "bytes": size}
+                   for shard_path, (offset, rows), (size, _) in zip(paths, plan, results)],
+    }
+    with open(manifest_path, "w", encoding="utf-8") as f:
+        json.dump(manifest, f, indent=2)
+    return manifest_path
@@ -0,0 +1,32 @@
+"""Seeded random streams for every generator.
+
+All sampling draws from Philox, a counter-based bit generator, keyed through SeedSequence
+by the seed and a stream key such as a chunk number. A stream depends on nothing else, so
+any chunk or shard of an output can be regenerated on its own, byte for byte, from the
+seed alone.
+"""
+import secrets
+
+import numpy as np
+
+# Seeds are kept below 2**63 so they fit the app's number inputs and JSON readers
+MAX_SEED = 2**63 - 1
+
+def new_seed():
+    """A fresh random seed, for outputs generated without one (report it to regenerate them)."""
+    return secrets.randbelow(MAX_SEED + 1)
+
+def seeded_rng(seed, *key):
+    """A Philox generator on the stream of seed named by key (e.g. a chunk number)."""
+    return np.random.Generator(np.random.Philox(np.random.SeedSequence(seed, spawn_key=key)))
+
+def chunk_rngs(seed, start, num_rows, chunk_rows):
+    """(first row, rows, generator) of each chunk of rows start..start+num_rows of an output.
+
+    Chunk k covers rows k*chunk_rows up to (k+1)*chunk_rows of the whole output and draws
+    from stream k of seed, so start must be a multiple of chunk_rows.
+    """
+    if start % chunk_rows:
+        raise ValueError(f"Output pieces must start at a multiple of {chunk_rows:,} rows.")
+    for first in range(start, start + num_rows, chunk_rows):
+        yield first, min(chunk_rows, start + num_rows - first), seeded_rng(seed, first // chunk_rows)
@@ -0,0 +1,164 @@
+"""Row sampling: stratified, oversampled and whole-transaction draws from catalog datasets, and one-pass trimming of CSV files."""
+import functools
+
+import numpy as np
+import pandas as pd
+
+from .baskets import sample_transactions
+from .datasets import file_digest, load_dataset
+from .export import CSV_CHUNK_ROWS
+from .oversampling import SMOTE_NEIGHBOURS, interpolate_rows, neighbour_index
+from .rng import new_seed, seeded_rng
+
+# Stratified and balanced samples draw each class's rows from per-class index arrays built
+# once per dataset
+@functools.lru_cache(maxsize=64)
+def _label_index(path, digest, label_column):
+    labels = load_dataset(path, [label_column])[label_column]
+    codes, classes = pd.factorize(labels, sort=True)
+    # Rows without a label (code -1) sort first and are left out
+    order = np.argsort(codes, kind="stable")
+    counts = np.bincount(codes[codes >= 0], minlength=len(classes))
+    order = order[len(codes) - counts.sum():]
+    return classes, order, np.concatenate([[0], np.cumsum(counts)])
+
+def label_index(path, label_column):
+    """(classes, row order, offsets): the rows of class i are order[offsets[i]:offsets[i + 1]]."""
+    return _label_index(path, file_digest(path), label_column)
+
+def allocate_rows(weights, num_rows, rng):
+    """Split num_rows between classes in proportion to weights, giving every class at least one row.
+
+    When there are more classes than rows, num_rows classes are drawn (weighted) to get one row
+    each. Rows left after rounding go to the largest remainders, with ties broken at random.
+    """
+    weights = np.asarray(weights, dtype=float)
+    sizes = np.zeros(len(weights), dtype=int)
+    if num_rows < len(weights):
+        sizes[rng.choice(len(weights), num_rows, replace=False, p=weights / weights.sum())] = 1
+        return sizes
+    shares = (num_rows - len(weights)) * weights / weights.sum()
+    sizes += 1 + np.floor(shares).astype(int)
+    remainders = shares - np.floor(shares)
+    extra = np.lexsort((rng.random(len(weights)), -remainders))[:num_rows - sizes.sum()]
+    sizes[extra] += 1
+    return sizes
+
+def stratified_indices(index, num_rows, mode, rng):
+    """Row positions for a stratified or class-balanced sample with replacement, in random order."""
+    classes, order, offsets = index
+    counts = np.diff(offsets)
+    sizes = allocate_rows(counts if mode == "stratified" else np.ones(len(counts)), num_rows, rng)
+    row_classes = np.repeat(np.arange(len(counts)), sizes)
+    positions = offsets[row_classes] + (rng.random(num_rows) * counts[row_classes]).astype(int)
+    return order[positions[rng.permutation(num_rows)]]
+
+def smote_sample(path, fields, num_rows, label_column, rng, k=SMOTE_NEIGHBOURS):
+    """A class-balanced sample of num_rows rows, in random order.
+
+    Every class gets an equal share of the rows. A class fills its share with its own rows,
+    drawn without replacement, and makes up any shortfall with new rows interpolated
+    between a random row of the class and one of its k nearest neighbours, all in one batch.
+    New rows are rounded as their columns are, so on coarse data (such as iris, measured to
+    a tenth) they can repeat each other or an original row.
+    """
+    classes, order, offsets = label_index(path, label_column)
+    counts = np.diff(offsets)
+    sizes = allocate_rows(np.ones(len(counts)), num_rows, rng)
+    originals, bases = [], []
+    for start, count, size in zip(offsets[:-1], counts, sizes):
+        rows = order[start:start + count]
+        originals.append(rows[rng.permutation(count)[:size]])
+        bases.append(rows[rng.integers(0, count, size=max(size - count, 0))])
+    originals, bases = np.concatenate(originals), np.concatenate(bases)
+
+    dataset = load_dataset(path, fields)
+    neighbours = neighbour_index(path, label_column, k)[bases, rng.integers(0, k, size=len(bases))]
+    sample = pd.concat([dataset.take(originals).reset_index(drop=True),
+                        interpolate_rows(dataset, bases, neighbours, rng.random(len(bases)))], ignore_index=True)
+    return sample.take(rng.permutation(len(sample)))
+
+def sample_dataset(path, fields, num_rows, seed=None, mode=None, label_column=None):
+    """Sample num_rows rows of the selected fields of a dataset, with replacement.
+
+    mode None draws uniformly random rows; "stratified" keeps the class proportions of
+    label_column and "balanced" draws the same number of rows from every class; "smote" does
+    too, but makes up for small classes with interpolated rows instead of repeats. For the
+    Association datasets, "transactions" draws num_rows whole transactions (without
+    replacement) and returns all of their rows. The same seed gives the same rows; None
+    draws a new seed.
+    """
+    rng = seeded_rng(new_seed() if seed is None else seed)
+    if mode == "transactions":
+        return sample_transactions(path, fields, num_rows, rng)
+    if mode == "smote":
+        return smote_sample(path, fields, num_rows, label_column, rng)
+    dataset = load_dataset(path, fields)
+    if mode is None:
+        return dataset.take(rng.integers(0, len(dataset), size=num_rows))
+    return dataset.take(stratified_indices(label_index(path, label_column), num_rows, mode, rng))
+
+# Out-of-core trimming: sample rows from a CSV of any size in one chunked pass
+def read_csv_columns(source):
+    """The column names of a CSV file (a path or an open file), read from its header only."""
+    columns = pd.read_csv(source, nrows=0).columns
+    if hasattr(source, "seek"):
+        source.seek(0)
+    return columns
+
+def reservoir_sample_csv(source, fields, num_rows, replace=False, seed=None, chunk_rows=CSV_CHUNK_ROWS, progress=None):
+    """Sample num_rows rows of the selected fields from a CSV file in one pass over its chunks.
+
+    Without replacement this is Algorithm R applied a chunk at a time: the row seen in
+    position j takes a uniformly drawn slot when that draw falls among the first num_rows
+    positions. With replacement every slot is an independent draw, so after t rows a chunk
+    of c rows takes over each slot with probability c / (t + c). Only the selected fields
+    of one chunk and the reservoir are held in memory. Returns the sample (which holds
+    every row when the file has fewer than num_rows rows without replacement) and the
+    number of rows read. The same seed and file give the same sample.
+    """
+    rng = seeded_rng(new_seed() if seed is None else seed)
+    # Chunks at least as large as the reservoir keep the cost of replacing slots linear
+    chunk_rows = max(chunk_rows, num_rows)
+    reservoir, seen = None, 0
+    for chunk in pd.read_csv(source, usecols=list(fields), chunksize=chunk_rows):
+        chunk = chunk[list(fields)].reset_index(drop=True)
+        if chunk.empty:
+            continue
+        if reservoir is None and not replace:
+            reservoir, chunk = chunk.iloc[:num_rows], chunk.iloc[num_rows:]
+            seen = len(reservoir)
+        if replace:
+            replaced = np.flatnonzero(rng.random(num_rows) < len(chunk) / (seen + len(chunk)))
+            rows = rng.integers(0, len(chunk), size=len(replaced))
+        else:
+            draws = rng.integers(0, np.arange(seen + 1, seen + len(chunk) + 1))
+            rows = np.flatnonzero(draws < num_rows)
+            # When two rows of a chunk draw the same slot, the later one wins, as in Algorithm R
+            replaced, last = np.unique(draws[rows][::-1], return_index=True)
+            rows = rows[::-1][last]
+        if len(rows):
+            if reservoir is None:
+                reservoir = chunk.take(rows)
+            else:
+                order = np.arange(len(reservoir))
+                order[replaced] = len(reservoir) + np.arange(len(rows))
+                reservoir = pd.concat([reservoir, chunk.take(rows)], ignore_index=True).take(order)
+        seen += len(chunk)
+        if progress is not None:
+            progress(seen)
+    if seen == 0:
+        # A header-only file: no rows to draw from
+        return pd.DataFrame(columns=list(fields)), seen
+    return reservoir.take(rng.permutation(len(reservoir))).reset_index(drop=True), seen
+
+def sample_rows(dataset, fields, num_rows, replace=False, seed=None):
+    """Sample num_rows rows of dataset[fields], as reservoir_sample_csv() does for a CSV file."""
+    if len(dataset) == 0:
+        return dataset[list(fields)].iloc[:0], 0
+    rng = seeded_rng(new_seed() if seed is None else seed)
+    if replace:
+        indices = rng.integers(0, len(dataset), size=num_rows)
+    else:
+        indices = rng.permutation(len(dataset))[:num_rows]
+    return dataset[list(fields)].take(indices).reset_index(drop=True), len(dataset)
@@ -0,0 +1,237 @@
+"""Dataset overviews and the streaming summary statistics behind them."""
+import io
+
+import numpy as np
+import pandas as pd
+
+from .export import CSV_CHUNK_ROWS
+
+# Streaming summary statistics: a one-pass, mergeable replacement for DataFrame.describe()
+# Quantiles are exact while a column holds at most this many values, approximate (KLL sketch) beyond
+QUANTILE_SKETCH_SIZE = 50_000
+# Category counts are exact while a column has at most this many distinct values
+CATEGORY_CAPACITY = 20_000
+DESCRIBE_PERCENTILES = (0.25, 0.5, 0.75)
+
+class QuantileSketch:
+    """KLL-style quantile sketch: level h holds items that each stand for 2**h values.
+
+    A level that outgrows its capacity is sorted and every other item (from a random
+    offset) is promoted to the next level. Capacities shrink geometrically towards the
+    lower levels, so memory stays O(size) whatever the number of values. Two sketches
+    merge by concatenating their levels and compacting again.
+    """
+
+    def __init__(self, size=QUANTILE_SKETCH_SIZE, seed=0):
+        self.size = size
+        self.levels = [np.empty(0)]
+        self.rng = np.random.default_rng(seed)
+
+    def update(self, values):
+        self.levels[0] = np.concatenate([self.levels[0], np.asarray(values, dtype=float)])
+        self._compact()
+
+    def merge(self, other):
+        for height, items in enumerate(other.levels):
+            if height == len(self.levels):
+                self.levels.append(np.empty(0))
+            self.levels[height] = np.concatenate([self.levels[height], items])
+        self._compact()
+
+    def _capacity(self, height):
+        return max(2, int(self.size * (2 / 3) ** (len(self.levels) - 1 - height)))
+
+    def _compact(self):
+        height = 0
+        while height < len(self.levels):
+            items = self.levels[height]
+            if len(items) > self._capacity(height):
+                if height + 1 == len(self.levels):
+                    self.levels.append(np.empty(0))
+                items = np.sort(items)
+                # An odd item out stays at this level so no weight is lost
+                kept, paired = items[:len(items) % 2], items[len(items) % 2:]
+                promoted = paired[self.rng.integers(2)::2]
+                self.levels[height] = kept
+                self.levels[height + 1] = np.concatenate([self.levels[height + 1], promoted])
+            height += 1
+
+    def quantiles(self, probabilities):
+        if len(self.levels) == 1:
+            # Nothing was compacted: the quantiles are exact and interpolated like describe()
+            if len(self.levels[0]) == 0:
+                return [np.nan] * len(probabilities)
+            return list(np.quantile(self.levels[0], probabilities))
+        values = np.concatenate(self.levels)
+        weights = np.concatenate([np.full(len(items), 2.0 ** height) for height, items in enumerate(self.levels)])
+        order = np.argsort(values)
+        cumulative = np.cumsum(weights[order])
+        ranks = np.searchsorted(cumulative, np.asarray(probabilities) * cumulative[-1], side="left")
+        return list(values[order][np.minimum(ranks, len(values) - 1)])
+
+class NumericSummary:
+    """Count, mean and variance (Welford/Chan), min/max and quantiles of a numeric column."""
+
+    def __init__(self):
+        self.count, self.mean, self.m2 = 0, 0.0, 0.0
+        self.min, self.max = np.inf, -np.inf
+        self.sketch = QuantileSketch()
+
+    def update(self, values):
+        values = pd.to_numeric(values, errors="coerce").to_numpy(dtype=float, na_value=np.nan)
+        values = values[~np.isnan(values)]
+        if len(values):
+            mean = values.mean()
+            self._combine(len(values), mean, ((values - mean) ** 2).sum(), values.min(), values.max())
+            self.sketch.update(values)
+
+    def merge(self, other):
+        if other.count:
+            self._combine(other.count, other.mean, other.m2, other.min, other.max)
+            self.sketch.merge(other.sketch)
+
+    def _combine(self, count, mean, m2, low, high):
+        total = self.count + count
+        delta = mean - self.mean
+        self.mean += delta * count / total
+        self.m2 += m2 + delta ** 2 * self.count * count / total
+        self.count = total
+        self.min, self.max = min(self.min, low), max(self.max, high)
+
+    def describe(self):
+        if self.count == 0:
+            return [0.0] + [np.nan] * (4 + len(DESCRIBE_PERCENTILES))
+        std = np.sqrt(self.m2 / (self.count - 1)) if self.count > 1 else np.nan
+        return [float(self.count), self.mean, std, self.min, *self.sketch.quantiles(DESCRIBE_PERCENTILES), self.max]
+
+class CategoricalSummary:
+    """Count, distinct values and most frequent values of a non-numeric column.
+
+    Counts are exact up to CATEGORY_CAPACITY distinct values. Past that, the table is
+    pruned back to its most frequent values whenever it doubles in size, so frequent
+    values keep (lower-bound) counts, and the number of distinct values is estimated
+    from the k smallest value hashes (KMV).
+    """
+
+    def __init__(self, capacity=CATEGORY_CAPACITY):
+        self.capacity = capacity
+        self.count = 0
+        self.counts = pd.Series(dtype="int64", index=pd.Index([], dtype=object))
+        self.pruned = False
+        self.hashes = np.empty(0, dtype=np.uint64)
+
+    def update(self, values):
+        counts = values.dropna().value_counts()
+        # Object labels align much faster than arrow-backed strings when merging tables
+        counts.index = counts.index.astype(object)
+        self._merge_counts(counts, int(counts.sum()), self._hashes(counts) if self.pruned else None)
+
+    def merge(self, other):
+        hashes = other.value_hashes() if self.pruned or other.pruned else None
+        self._merge_counts(other.counts, other.count, hashes)
+
+    def value_hashes(self):
+        """The smallest hashes of the distinct values seen, for the KMV estimate."""
+        return self.hashes if self.pruned else self._hashes(self.counts)
+
+    def _hashes(self, counts):
+        return np.sort(pd.util.hash_array(counts.index.to_numpy()))[:self.capacity]
+
+    def _merge_counts(self, counts, count, hashes):
+        self.count += count
+        # Grouping hashes the labels; Series.add would sort their union on every chunk
+        self.counts = pd.concat([self.counts, counts]).groupby(level=0, sort=False).sum()
+        if hashes is not None or len(self.counts) > 2 * self.capacity:
+            if not self.pruned:
+                # Hashes are only tracked once the exact table no longer holds every value
+                self.hashes, self.pruned = self._hashes(self.counts), True
+            if hashes is not None:
+                self.hashes = np.unique(np.concatenate([self.hashes, hashes]))[:self.capacity]
+            self.counts = self.counts.nlargest(self.capacity, keep="first")
+
+    def describe(self):
+        if not self.pruned:
+            unique = len(self.counts)
+        elif len(self.hashes) < self.capacity:
+            unique = len(self.hashes)
+        else:
+            unique = int((self.capacity - 1) / (float(self.hashes[-1]) / 2.0 ** 64))
+        if self.counts.empty:
+            return [self.count, unique, np.nan, np.nan]
+        top = self.counts.idxmax()
+        return [self.count, unique, top, int(self.counts[top])]
+
+class StreamingSummary:
+    """Summarize a dataset chunk by chunk in constant memory, in the layout of describe().
+
+    Call update() with each chunk (a DataFrame), or merge() summaries built from other
+    chunks or workers. Like describe(), the result covers the numeric columns when there
+    are any, and otherwise shows count/unique/top/freq for the other columns; the other
+    columns are therefore only counted while there are no numeric ones.
+    """
+
+    def __init__(self):
+        self.columns = {}
+
+    def update(self, chunk):
+        for column in chunk.columns:
+            if column not in self.columns:
+                numeric = pd.api.types.is_numeric_dtype(chunk[column]) and not pd.api.types.is_bool_dtype(chunk[column])
+                self.columns[column] = NumericSummary() if numeric else CategoricalSummary()
+        numeric_only = any(isinstance(summary, NumericSummary) for summary in self.columns.values())
+        for column in chunk.columns:
+            if isinstance(self.columns[column], NumericSummary) or not numeric_only:
+                self.columns[column].update(chunk[column])
+        return self
+
+    def merge(self, other):
+        for column, summary in other.columns.items():
+            if column not in self.columns:
+                self.columns[column] = type(summary)()
+            self.columns[column].merge(summary)
+        return self
+
+    def describe(self):
+        numeric = [column for column, summary in self.columns.items() if isinstance(summary, NumericSummary)]
+        if numeric:
+            index = ["count", "mean", "std", "min", *[f"{p:.0%}" for p in DESCRIBE_PERCENTILES], "max"]
+            return pd.DataFrame({column: self.columns[column].describe() for column in numeric}, index=index, dtype=float)
+        index = ["count", "unique", "top", "freq"]
+        return pd.DataFrame({column: summary.describe() for column, summary in self.columns.items()}, index=index, dtype=object)
+
+def summarize(df, chunk_rows=CSV_CHUNK_ROWS):
+    """describe() computed by the streaming engine, one chunk of rows at a time."""
+    summary = StreamingSummary()
+    for start in range(0, max(len(df), 1), chunk_rows):
+        summary.update(df.iloc[start:start + chunk_rows])
+    return summary.describe()
+
+# Dataset overviews: shape, columns, dtypes, summary statistics, head and tail
+def compute_overview(df):
+    """Compute everything the "Dataset Overview" section shows for a frame."""
+    return {
+        "shape": df.shape,
+        "columns": df.columns,
+        "dtypes": df.dtypes.astype(str),
+        "describe": summarize(df),
+        "head": df.head(),
+        "tail": df.tail(),
+    }
+
+def overview_to_json(overview):
+    """Encode an overview so it can be stored in the catalog manifest."""
+    encoded = {"shape": list(overview["shape"]), "columns": list(overview["columns"]), "dtypes": list(overview["dtypes"])}
+    for key in ("describe", "head", "tail"):
+        encoded[key] = overview[key].to_json(orient="split", date_format="iso")
+    return encoded
+
+def overview_from_json(encoded):
+    """Decode an overview stored by overview_to_json()."""
+    overview = {
+        "shape": tuple(encoded["shape"]),
+        "columns": pd.Index(encoded["columns"]),
+        "dtypes": pd.Series(encoded["dtypes"], index=encoded["columns"]),
+    }
+    for key in ("describe", "head", "tail"):
+        overview[key] = pd.read_json(io.StringIO(encoded[key]), orient="split", dtype=False, convert_dates=False)
+    return overview
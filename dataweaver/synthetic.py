@@ -0,0 +1,373 @@
+"""Distribution-fitted and template-driven synthetic data."""
+import functools
+import re
+
+import numpy as np
+import pandas as pd
+
+from .datasets import file_digest, load_dataset
+from .export import CSV_CHUNK_ROWS, stream_frames_to_csv
+from .rng import MAX_SEED, new_seed, seeded_rng
+
+# Distribution-fitted synthetic data
+# How each data.csv field is modelled; fields not listed here fall back to their dtype
+SYNTHETIC_FIELD_KINDS = {
+    "Country": "categorical",
+    "Region": "categorical",
+    "List": "categorical",
+    "Number Range": "numeric",
+    "Currency": "numeric",
+    "Postal Zip": "numeric",
+    "Phone": "template",
+    "Email": "template",
+    "Alphanumeric": "template",
+    "Address": "template",
+}
+HISTOGRAM_BINS = 20
+# Number-like text columns spanning at most this many distinct values are formatted via a lookup table
+FORMAT_TABLE_LIMIT = 1_000_000
+NUMBER_PATTERN = r"^(?P<prefix>[^\d.+-]*)(?P<number>[+-]?\d+(?:\.(?P<fraction>\d+))?)$"
+
+def fit_categorical(series):
+    """Model a column by the observed frequency of each distinct value."""
+    counts = series.value_counts(dropna=False)
+    return {
+        "kind": "categorical",
+        "values": counts.index.to_numpy(dtype=object),
+        "cumulative": np.cumsum(counts.to_numpy()) / counts.sum(),
+    }
+
+def fit_numeric(series):
+    """Model a numeric (or number-like text) column by a histogram of its values.
+
+    Text such as "$93.27" is parsed with its most common prefix, which is added back when
+    sampling. Values that do not parse are kept as a categorical remainder drawn with
+    their observed share. Integer columns with a small range get one bin per value, so
+    their distribution is reproduced exactly.
+    """
+    series = series.dropna()
+    model = {"kind": "numeric", "prefix": None, "other": None, "other_share": 0.0}
+    if pd.api.types.is_numeric_dtype(series):
+        numbers = series.to_numpy(dtype=float)
+        model["decimals"] = 0 if pd.api.types.is_integer_dtype(series) else None
+    else:
+        parts = series.astype(str).str.strip().str.extract(NUMBER_PATTERN)
+        parsed = parts["number"].notna()
+        prefix = parts.loc[parsed, "prefix"].mode()
+        model["prefix"] = prefix.iloc[0] if len(prefix) else ""
+        numeric = parsed & (parts["prefix"] == model["prefix"])
+        if (~numeric).any():
+            model["other"] = fit_categorical(series[~numeric])
+            model["other_share"] = float((~numeric).mean())
+        numbers = parts.loc[numeric, "number"].astype(float).to_numpy()
+        model["decimals"] = int(parts.loc[numeric, "fraction"].str.len().max()) if parts.loc[numeric, "fraction"].notna().any() else 0
+    if len(numbers) == 0:
+        return fit_categorical(series)
+
+    low, high = numbers.min(), numbers.max()
+    if model["decimals"] == 0 and high - low < 100:
+        edges = np.arange(low - 0.5, high + 1.5)
+    else:
+        edges = np.histogram_bin_edges(numbers, bins=HISTOGRAM_BINS)
+    counts, edges = np.histogram(numbers, bins=edges)
+    model.update(low=low, high=high, edges=edges, cumulative=np.cumsum(counts) / counts.sum(), labels=None)
+
+    # Render every representable value once, so sampling text is a gather instead of formatting
+    steps = int(round((high - low) * 10 ** (model["decimals"] or 0)))
+    if model["prefix"] is not None and steps < FORMAT_TABLE_LIMIT:
+        grid = low + np.arange(steps + 1) / 10 ** model["decimals"]
+        model["labels"] = format_numbers(grid, model["prefix"], model["decimals"]).astype(object)
+    return model
+
+@functools.lru_cache(maxsize=16)
+def _fit_synthetic_model(path, digest):
+    dataset = load_dataset(path)
+    model = {}
+    for field in dataset.columns:
+        kind = SYNTHETIC_FIELD_KINDS.get(field, "numeric" if pd.api.types.is_numeric_dtype(dataset[field]) else "categorical")
+        fit = {"numeric": fit_numeric, "template": infer_template, "categorical": fit_categorical}[kind]
+        model[field] = fit(dataset[field])
+    return model
+
+def fit_synthetic_model(path):
+    """Fit (once per file version) an independent distribution for every column of a CSV."""
+    return _fit_synthetic_model(path, file_digest(path))
+
+def format_numbers(numbers, prefix, decimals):
+    """Render numbers as text with a fixed prefix and number of decimals, without a Python loop."""
+    scale = 10 ** decimals
+    scaled = np.rint(numbers * scale).astype(np.int64)
+    text = (np.abs(scaled) // scale).astype(str)
+    if prefix or (scaled < 0).any():
+        text = np.char.add(np.where(scaled < 0, prefix + "-", prefix), text)
+    if decimals:
+        fraction = np.char.zfill((np.abs(scaled) % scale).astype(str), decimals)
+        text = np.char.add(np.char.add(text, "."), fraction)
+    return text
+
+# Template-driven string synthesis
+# Template syntax: 9 = digit, A = uppercase letter, a = lowercase letter, {x|y|z} = one of the
+# listed options, \ escapes the next character, anything else is copied literally.
+TEMPLATE_ALPHABETS = {
+    "9": "0123456789",
+    "A": "ABCDEFGHIJKLMNOPQRSTUVWXYZ",
+    "a": "abcdefghijklmnopqrstuvwxyz",
+}
+# Inference also recognises capitalised words ("Aa"), so "Road" is one token rather than "R" + "oad"
+TEMPLATE_TOKEN = re.compile(r"[0-9]+|[A-Z][a-z]+|[A-Z]+|[a-z]+|.", re.DOTALL)
+# Inferred templates keep the most common shapes, and turn a token position into a list of
+# options when it repeats a few values (e.g. e-mail domains) instead of varying freely.
+TEMPLATE_MAX_SHAPES = 50
+TEMPLATE_CHOICE_LIMIT = 12
+# Mixing rounds of the keyed permutation that turns row numbers into a template's characters
+TEMPLATE_ROUNDS = 3
+
+def _token_class(token):
+    if len(token) > 1 and token[0] in TEMPLATE_ALPHABETS["A"] and token[1] in TEMPLATE_ALPHABETS["a"]:
+        return "Aa"
+    for symbol, alphabet in TEMPLATE_ALPHABETS.items():
+        if token[0] in alphabet:
+            return symbol
+    return token
+
+def _run_segment(symbol, lengths):
+    lengths, counts = np.unique(np.asarray(lengths), return_counts=True)
+    alphabet = TEMPLATE_ALPHABETS["a" if symbol == "Aa" else symbol]
+    return {"kind": "run", "alphabet": np.frombuffer(alphabet.encode("utf-32-le"), dtype="<u4"), "capitalize": symbol == "Aa",
+            "lengths": lengths, "cumulative": np.cumsum(counts) / counts.sum()}
+
+def _choice_segment(options):
+    counts = pd.Series(options).value_counts()
+    return {"kind": "choice", "values": counts.index.to_numpy(dtype=str), "cumulative": np.cumsum(counts.to_numpy()) / counts.sum()}
+
+def _template_model(shapes, weights):
+    weights = np.asarray(weights, dtype=float)
+    return {"kind": "template", "shapes": shapes, "cumulative": np.cumsum(weights) / weights.sum()}
+
+def infer_template(series):
+    """Infer a weighted set of templates from example values.
+
+    Each value is split into runs of digits, uppercase and lowercase letters, and single
+    other characters; values with the same sequence of run types share a shape. Within a
+    shape, a position becomes a run of random characters with the observed lengths, or a
+    list of options when it only takes a few repeated values.
+    """
+    groups = {}
+    for value in series.dropna().astype(str):
+        tokens = TEMPLATE_TOKEN.findall(value)
+        groups.setdefault(tuple(_token_class(token) for token in tokens), []).append(tokens)
+
+    shapes, weights = [], []
+    for signature, rows in sorted(groups.items(), key=lambda item: -len(item[1]))[:TEMPLATE_MAX_SHAPES]:
+        segments = []
+        for position, symbol in enumerate(signature):
+            tokens = [row[position] for row in rows]
+            distinct = set(tokens)
+            if symbol not in TEMPLATE_ALPHABETS and symbol != "Aa":
+                segments.append({"kind": "literal", "text": symbol})
+            elif len(distinct) <= TEMPLATE_CHOICE_LIMIT and len(distinct) * 2 <= len(tokens):
+                segments.append(_choice_segment(tokens))
+            else:
+                segments.append(_run_segment(symbol, [len(token) for token in tokens]))
+        shapes.append(_merge_literals(segments))
+        weights.append(len(rows))
+    if not shapes:
+        raise ValueError("Cannot infer a template from a column without values.")
+    return _template_model(shapes, weights)
+
+def parse_template(text):
+    """Parse a user template such as "(999) 999-9999" or "aaaaaa@{aol|gmail}.{com|org}"."""
+    segments, position = [], 0
+    while position < len(text):
+        character = text[position]
+        if character == "\\" and position + 1 < len(text):
+            segments.append({"kind": "literal", "text": text[position + 1]})
+            position += 2
+        elif character == "{":
+            end = text.find("}", position)
+            if end == -1:
+                raise ValueError(f"Unclosed '{{' at position {position} of template {text!r}.")
+            segments.append(_choice_segment(text[position + 1:end].split("|")))
+            position = end + 1
+        elif character in TEMPLATE_ALPHABETS:
+            end = position
+            while end < len(text) and text[end] == character:
+                end += 1
+            segments.append(_run_segment(character, [end - position]))
+            position = end
+        else:
+            segments.append({"kind": "literal", "text": character})
+            position += 1
+    if not segments:
+        raise ValueError("The template is empty.")
+    return _template_model([_merge_literals(segments)], [1])
+
+def _merge_literals(segments):
+    merged = []
+    for segment in segments:
+        if segment["kind"] == "literal" and merged and merged[-1]["kind"] == "literal":
+            merged[-1] = {"kind": "literal", "text": merged[-1]["text"] + segment["text"]}
+        else:
+            merged.append(segment)
+    return merged
+
+def _render_segment(segment, size, rng, letters=None):
+    if segment["kind"] == "literal":
+        return segment["text"]
+    if segment["kind"] == "choice":
+        picks = np.searchsorted(segment["cumulative"], rng.random(size), side="right")
+        return segment["values"][np.minimum(picks, len(segment["values"]) - 1)]
+
+    # Characters are a (rows x longest length) matrix of code points that is viewed directly
+    # as a numpy unicode array; trailing zeros end the shorter strings.
+    picks = np.minimum(np.searchsorted(segment["cumulative"], rng.random(size), side="right"), len(segment["lengths"]) - 1)
+    lengths = segment["lengths"][picks]
+    width = int(segment["lengths"].max())
+    # A row's number may need more characters than the length drawn for it
+    letters, needed = letters
+    lengths = np.maximum(lengths, needed)
+    codes = segment["alphabet"][letters.T]
+    if segment["capitalize"]:
+        codes[:, 0] -= ord("a") - ord("A")
+    codes[np.arange(width) >= lengths[:, None]] = 0
+    return np.ascontiguousarray(codes).view(f"<U{width}").ravel()
+
+def _template_letters(shape, rows, key):
+    """The characters (as alphabet positions) of every run segment of a shape, from the row numbers.
+
+    Row number r is written in mixed radix over the run characters: first those every
+    value has, then the optional ones, shortest first. The characters every value has are
+    scrambled by TEMPLATE_ROUNDS rounds that each add to one character a keyed constant and
+    a keyed hash of all the others, which can be undone (the constant keeps row 0 from
+    always showing the first letter of every alphabet). Optional characters are shifted by a keyed hash of
+    the scrambled ones, and a run is at least long enough to show its nonzero optional
+    characters. Two rows then differ in a character both show or in a run's length, so
+    distinct rows get distinct strings. Returns one (characters x rows, needed lengths)
+    pair per run segment.
+    """
+    runs = [segment for segment in shape if segment["kind"] == "run"]
+    shortest = [int(segment["lengths"].min()) for segment in runs]
+    widths = [int(segment["lengths"].max()) for segment in runs]
+    # (run, character) of each digit, least significant first
+    places = [(run, place) for run in range(len(runs)) for place in range(shortest[run])]
+    required = len(places)
+    places += [(run, shortest[run] + depth) for depth in range(max(widths, default=0)) for run in range(len(runs))
+               if shortest[run] + depth < widths[run]]
+    bases = np.array([len(runs[run]["alphabet"]) for run, _ in places], dtype=np.uint64)
+
+    digits = np.empty((len(places), len(rows)), dtype=np.uint64)
+    number = rows.astype(np.uint64)
+    for position, base in enumerate(bases):
+        digits[position], number = number % base, number // base
+
+    multipliers = seeded_rng(*key).integers(1, 2**63, size=(TEMPLATE_ROUNDS + 1, len(places)), dtype=np.uint64) | np.uint64(1)
+    mix, shift = np.uint64(0x9E3779B97F4A7C15), np.uint64(32)
+    # Products wrap around modulo 2**64, which only feeds the hashes
+    for weights in multipliers[:TEMPLATE_ROUNDS]:
+        total = weights @ digits
+        constants = (weights >> shift) % bases
+        for position in range(required):
+            others = total - weights[position] * digits[position]
+            shifted = (digits[position] + constants[position] + ((others * mix) >> shift)) % bases[position]
+            total += weights[position] * (shifted - digits[position])
+            digits[position] = shifted
+
+    letters = [np.zeros((width, len(rows)), dtype=np.intp) for width in widths]
+    needed = [np.zeros(len(rows), dtype=np.intp) for _ in runs]
+    scrambled = multipliers[-1][:required] @ digits[:required]
+    for position, (run, place) in enumerate(places):
+        if position >= required:
+            needed[run][digits[position] > 0] = place + 1
+            digits[position] += (((scrambled ^ multipliers[-1][position]) * mix) >> shift) % bases[position]
+        letters[run][place] = digits[position] % bases[position]
+    return list(zip(letters, needed))
+
+def _render_template(model, size, rng, rows, key):
+    values = np.empty(size, dtype=object)
+    picks = np.minimum(np.searchsorted(model["cumulative"], rng.random(size), side="right"), len(model["shapes"]) - 1)
+    for index, shape in enumerate(model["shapes"]):
+        chosen = np.flatnonzero(picks == index)
+        if len(chosen) == 0:
+            continue
+        letters = iter(_template_letters(shape, rows[chosen], key + (index,)))
+        text = np.full(len(chosen), "", dtype="<U1")
+        for segment in shape:
+            text = np.char.add(text, _render_segment(segment, len(chosen), rng, next(letters) if segment["kind"] == "run" else None))
+        values[chosen] = text
+    return values
+
+def sample_template(model, size, rng, offset=0, key=None):
+    """Generate size values from a template model for rows offset..offset+size of an output.
+
+    The characters of a value are a keyed, invertible function of its row number, so values
+    of one shape do not repeat across the whole output (every chunk and shard of it): rows
+    past the strings of the shortest lengths get longer values, and only a shape of fixed
+    lengths with fewer strings than the output has rows repeats. key (a tuple of integers,
+    such as the output's seed and the field's position) must be the same for every chunk
+    of an output; without one, values are unique within this call only.
+    """
+    key = (int(rng.integers(MAX_SEED)),) if key is None else tuple(key)
+    return _render_template(model, size, rng, np.arange(offset, offset + size), key)
+
+def sample_column(model, size, rng, offset=0, key=None):
+    """Draw size independent values from a fitted column model (or a compiled field spec).
+
+    offset is the position of the first row in the output, which only sequences and
+    templates depend on; key is the template key of sample_template().
+    """
+    if model["kind"] == "template":
+        return sample_template(model, size, rng, offset, key)
+    if model["kind"] == "range":
+        low, high = model["low"], model["high"]
+        if model["distribution"] == "normal":
+            numbers = rng.normal((low + high) / 2, (high - low) / 6, size)
+        elif model["distribution"] == "exponential":
+            numbers = low + rng.exponential(max(high - low, 1e-12) / 5, size)
+        elif model["decimals"] == 0:
+            return rng.integers(low, high + 1, size=size)
+        else:
+            numbers = rng.uniform(low, high, size)
+        numbers = np.clip(numbers, low, high)
+        return np.rint(numbers).astype(np.int64) if model["decimals"] == 0 else np.round(numbers, model["decimals"])
+    if model["kind"] == "date":
+        return model["start"] + rng.integers(0, model["days"], size=size).astype("timedelta64[D]")
+    if model["kind"] == "sequence":
+        numbers = model["start"] + model["step"] * np.arange(offset, offset + size)
+        return np.char.add(model["prefix"], numbers.astype(str)).astype(object) if model["prefix"] else numbers
+    if model["kind"] == "categorical":
+        picks = np.searchsorted(model["cumulative"], rng.random(size), side="right")
+        return model["values"][np.minimum(picks, len(model["values"]) - 1)]
+
+    bins = np.minimum(np.searchsorted(model["cumulative"], rng.random(size), side="right"), len(model["cumulative"]) - 1)
+    left, right = model["edges"][bins], model["edges"][bins + 1]
+    numbers = np.clip(left + rng.random(size) * (right - left), model["low"], model["high"])
+    if model["decimals"] == 0:
+        numbers = np.rint(numbers).astype(np.int64)
+    elif model["decimals"] is not None:
+        numbers = np.round(numbers, model["decimals"])
+    if model["prefix"] is None:
+        return numbers
+
+    if model["labels"] is not None:
+        values = model["labels"][np.rint((numbers - model["low"]) * 10 ** model["decimals"]).astype(np.int64)]
+    else:
+        values = format_numbers(numbers, model["prefix"], model["decimals"]).astype(object)
+    if model["other"] is not None:
+        other = rng.random(size) < model["other_share"]
+        values[other] = sample_column(model["other"], int(other.sum()), rng)
+    return values
+
+def sample_synthetic(model, fields, size, rng, offset=0, seed=None):
+    """Draw size new rows, sampling each selected field independently from its model.
+
+    seed is the seed of the whole output, which keeps template values unique across its chunks.
+    """
+    return pd.DataFrame({field: sample_column(model[field], size, rng, offset, None if seed is None else (seed, position))
+                         for position, field in enumerate(fields)})
+
+def stream_synthetic_to_csv(model, fields, num_rows, path, seed=None, chunk_rows=CSV_CHUNK_ROWS, progress=None, summary=None,
+                            offset=0):
+    """Write num_rows synthetic rows to a CSV file with stream_frames_to_csv(); returns the seed."""
+    seed = new_seed() if seed is None else seed
+    return stream_frames_to_csv(lambda first, size, rng: sample_synthetic(model, fields, size, rng, first, seed), fields,
+                                num_rows, path, seed, chunk_rows, progress, summary, offset)
@@ -0,0 +1,22 @@
+import numpy as np
+import pandas as pd
+
+from dataweaver import bootstrap
+
+def test_out_of_bag_rows_are_the_rows_never_drawn(monkeypatch):
+    monkeypatch.setattr(bootstrap, "OOB_BLOCK_CELLS", 100)
+    indices = bootstrap.bootstrap_indices(30, 25, 30, np.random.default_rng(0))
+    indptr, rows = bootstrap.out_of_bag(indices, 30)
+    assert len(indptr) == 26
+    for b, drawn in enumerate(indices):
+        assert rows[indptr[b]:indptr[b + 1]].tolist() == sorted(set(range(30)) - set(drawn.tolist()))
+
+def test_archive_round_trip(tmp_path):
+    data = pd.DataFrame({"a": range(10), "b": list("abcdefghij")})
+    boot = bootstrap.bootstrap_replicates(data, 5, np.random.default_rng(1))
+    bootstrap.write_bootstrap_archive(boot, tmp_path / "boot.zip", {"seed": 1})
+    loaded, manifest = bootstrap.load_bootstrap_archive(tmp_path / "boot.zip")
+    assert manifest["seed"] == 1 and manifest["replicates"] == 5
+    for b in range(5):
+        pd.testing.assert_frame_equal(loaded.replicate(b).reset_index(drop=True), boot.replicate(b).reset_index(drop=True))
+        pd.testing.assert_frame_equal(loaded.out_of_bag(b).reset_index(drop=True), boot.out_of_bag(b).reset_index(drop=True))
@@ -0,0 +1,54 @@
+import concurrent.futures
+
+import pandas as pd
+import pytest
+
+from dataweaver import baskets, datasets
+
+def test_concurrent_cache_builds_do_not_collide(tmp_path, monkeypatch):
+    monkeypatch.setattr(datasets, "CACHE_DIR", str(tmp_path))
+    monkeypatch.setattr(baskets, "CACHE_DIR", str(tmp_path))
+    path = "Datasets for ML/Association/groceries_data.csv"
+    digest = datasets.file_digest(path)
+    layout = baskets.basket_layout(path)
+    with concurrent.futures.ThreadPoolExecutor(8) as pool:
+        columnar = list(pool.map(lambda _: datasets.build_columnar_cache(path, digest), range(8)))
+        cached = list(pool.map(lambda _: baskets.build_basket_cache(path, digest, layout), range(8)))
+    assert len(set(columnar)) == 1 and len(set(cached)) == 1
+    assert pd.read_feather(columnar[0]).shape == pd.read_csv(path).shape
+    assert not [name for name in (tmp_path / "columnar").iterdir() if name.suffix == ".tmp"]
+    assert not [name for name in (tmp_path / "baskets").iterdir() if name.suffix == ".tmp"]
+
+def test_loaded_frames_cannot_change_the_shared_copy():
+    for path in ("data.csv", "Datasets for ML/Classification/iris_data.csv"):
+        expected = datasets.load_dataset(path).copy()
+        frame = datasets.load_dataset(path)
+        column = frame.columns[0]
+        frame.loc[0, column] = frame.loc[1, column]
+        frame[frame.columns[1]] = None
+        frame.iloc[:, 2:3] = frame.iloc[:, 2:3].iloc[::-1].to_numpy()
+        pd.testing.assert_frame_equal(datasets.load_dataset(path), expected)
+
+def test_datasets_without_labels_have_no_class_count(monkeypatch):
+    catalog = {
+        "binary.csv": {"task": "Classification", "classes": 2, "label": "Binary"},
+        "multi.csv": {"task": "Classification", "classes": 5, "label": "Multi"},
+        "unlabelled.csv": {"task": "Classification", "classes": None, "label": "Unlabelled"},
+    }
+    monkeypatch.setattr(datasets, "load_catalog", lambda: catalog)
+    assert list(datasets.catalog_datasets("Classification", max_classes=2)) == ["Binary"]
+    assert list(datasets.catalog_datasets("Classification", min_classes=3)) == ["Multi"]
+    assert len(datasets.catalog_datasets("Classification")) == 3
+
+def test_unreadable_files_are_left_out_of_the_catalog(tmp_path, monkeypatch):
+    folder = tmp_path / "datasets" / "Classification"
+    folder.mkdir(parents=True)
+    (folder / "good_data.csv").write_text("x,target\n1,a\n2,b\n")
+    (folder / "empty_data.csv").write_text("")
+    monkeypatch.setattr(datasets, "DATASETS_DIR", str(tmp_path / "datasets"))
+    monkeypatch.setattr(datasets, "CACHE_DIR", str(tmp_path / "cache"))
+    monkeypatch.setattr(datasets, "CATALOG_PATH", str(tmp_path / "cache" / "catalog.json"))
+    with pytest.warns(UserWarning, match="empty_data.csv"):
+        catalog = datasets.update_catalog()
+    assert list(catalog) == ["Classification/good_data.csv"]
+    assert catalog["Classification/good_data.csv"]["classes"] == 2
@@ -0,0 +1,11 @@
+import os
+
+from dataweaver import export
+
+def test_sessions_write_the_same_file_name_to_different_files(tmp_path, monkeypatch):
+    monkeypatch.setattr(export, "OUTPUT_DIR", str(tmp_path))
+    paths = [export.output_file_path("../dataset", directory=export.new_output_dir()) for _ in range(2)]
+    assert paths[0] != paths[1]
+    for path in paths:
+        assert os.path.basename(path) == "dataset.csv"
+        assert os.path.dirname(os.path.dirname(path)) == str(tmp_path)
@@ -0,0 +1,24 @@
+import itertools
+
+import numpy as np
+import pandas as pd
+
+from dataweaver.baskets import frame_baskets
+from dataweaver.itemsets import frequent_itemsets
+
+def test_frequent_itemsets_match_brute_force():
+    rng = np.random.default_rng(0)
+    # Transactions of 1 to 5 items, some repeated, with skewed item frequencies
+    sizes = rng.integers(1, 6, 300)
+    rows = pd.DataFrame({"t": np.repeat(np.arange(300), sizes), "item": [f"item{code}" for code in rng.zipf(1.6, sizes.sum()) % 12]})
+    baskets = frame_baskets(rows, {"transaction": ["t"], "item": "item"})
+    transactions = [set(group) for _, group in rows.groupby("t")["item"]]
+    codes = {item: code for code, item in enumerate(baskets.items)}
+
+    expected = {}
+    for size in range(1, 4):
+        for itemset in itertools.combinations(sorted(codes), size):
+            count = sum(set(itemset) <= transaction for transaction in transactions)
+            if count >= 0.03 * len(transactions):
+                expected[tuple(sorted(codes[item] for item in itemset))] = count
+    assert frequent_itemsets(baskets, min_support=0.03, max_size=3) == expected
@@ -0,0 +1,18 @@
+import numpy as np
+
+from dataweaver import oversampling
+
+def test_blocked_nearest_neighbours_match_brute_force(monkeypatch):
+    monkeypatch.setattr(oversampling, "BLOCK_ROWS", 7)
+    features = np.random.default_rng(0).normal(size=(50, 3))
+    neighbours = oversampling.nearest_neighbours(features, 4)
+    distances = ((features[:, None] - features[None]) ** 2).sum(axis=2)
+    np.fill_diagonal(distances, np.inf)
+    expected = np.argsort(distances, axis=1)[:, :4]
+    assert (np.sort(neighbours, axis=1) == np.sort(expected, axis=1)).all()
+
+def test_rows_with_few_neighbours_repeat_them():
+    assert (oversampling.nearest_neighbours(np.zeros((1, 2)), 3) == 0).all()
+    neighbours = oversampling.nearest_neighbours(np.array([[0.0], [1.0], [3.0]]), 5)
+    assert neighbours.shape == (3, 5)
+    assert [sorted(set(row)) for row in neighbours] == [[1, 2], [0, 2], [0, 1]]
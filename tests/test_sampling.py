@@ -0,0 +1,37 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from dataweaver.sampling import reservoir_sample_csv, sample_rows
+
+@pytest.mark.parametrize("replace", [False, True])
+def test_reservoir_sample_is_uniform(replace):
+    text = "row\n" + "".join(f"{row}\n" for row in range(12))
+    counts = np.zeros(12)
+    for seed in range(300):
+        # Chunks of 4 rows, so rows enter the reservoir from three different chunks
+        rows, seen = reservoir_sample_csv(io.StringIO(text), ["row"], 4, replace=replace, seed=seed, chunk_rows=4)
+        assert seen == 12 and len(rows) == 4
+        assert replace or rows["row"].is_unique
+        counts += np.bincount(rows["row"], minlength=12)
+    expected = counts.sum() / 12
+    # Chi-squared with 11 degrees of freedom, below its 0.1% tail
+    assert ((counts - expected) ** 2 / expected).sum() < 31.3
+
+@pytest.mark.parametrize("replace", [False, True])
+def test_reservoir_sample_of_header_only_csv_is_empty(tmp_path, replace):
+    path = tmp_path / "empty.csv"
+    path.write_text("a,b\n")
+    rows, seen = reservoir_sample_csv(str(path), ["b", "a"], 5, replace=replace, seed=1)
+    assert seen == 0
+    assert rows.empty
+    assert list(rows.columns) == ["b", "a"]
+
+@pytest.mark.parametrize("replace", [False, True])
+def test_sample_rows_of_empty_frame_is_empty(replace):
+    rows, total = sample_rows(pd.DataFrame({"a": [], "b": []}), ["b"], 5, replace=replace, seed=1)
+    assert total == 0
+    assert rows.empty
+    assert list(rows.columns) == ["b"]
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from dataweaver.stats import QuantileSketch, StreamingSummary
+
+def test_summary_of_chunks_matches_describe():
+    rng = np.random.default_rng(0)
+    dataset = pd.DataFrame({"x": rng.normal(5, 2, 5_000), "n": rng.integers(0, 100, 5_000), "s": rng.choice(list("abc"), 5_000)})
+    dataset.loc[::7, "x"] = np.nan
+    chunked, merged = StreamingSummary(), StreamingSummary()
+    for start in range(0, len(dataset), 999):
+        chunked.update(dataset.iloc[start:start + 999])
+        merged.merge(StreamingSummary().update(dataset.iloc[start:start + 999]))
+    for summary in (chunked, merged):
+        pd.testing.assert_frame_equal(summary.describe(), dataset.describe().astype(float))
+
+def test_summary_of_text_columns_matches_describe():
+    dataset = pd.DataFrame({"s": list("abcabca") * 100, "t": list("xyyzzzz") * 100})
+    summary = StreamingSummary().update(dataset.iloc[:300]).update(dataset.iloc[300:])
+    assert summary.describe().values.tolist() == dataset.describe().values.tolist()
+
+def test_sketch_quantiles_are_close_in_rank():
+    values = np.random.default_rng(1).permutation(200_000).astype(float)
+    sketch = QuantileSketch(size=500)
+    for chunk in np.array_split(values, 37):
+        sketch.update(chunk)
+    assert len(np.concatenate(sketch.levels)) < 5_000
+    estimates = np.array(sketch.quantiles([0.01, 0.25, 0.5, 0.75, 0.99]))
+    # A value's rank in a permutation of 0..n-1 is the value itself
+    assert np.abs(estimates / len(values) - [0.01, 0.25, 0.5, 0.75, 0.99]).max() < 0.02
+
+def test_summary_of_empty_numeric_column_matches_describe():
+    dataset = pd.DataFrame({"x": [1.0, 2.0, 3.0], "empty": [np.nan] * 3})
+    pd.testing.assert_frame_equal(StreamingSummary().update(dataset).describe(), dataset.describe())
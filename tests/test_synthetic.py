@@ -0,0 +1,25 @@
+import pandas as pd
+
+from dataweaver.rng import seeded_rng
+from dataweaver.synthetic import fit_synthetic_model, parse_template, sample_template, stream_synthetic_to_csv
+
+FIELDS = ["Phone", "Email", "Alphanumeric"]
+
+def test_template_values_are_unique_across_chunks_and_shards(tmp_path):
+    model = fit_synthetic_model("data.csv")
+    whole, first, rest = tmp_path / "whole.csv", tmp_path / "first.csv", tmp_path / "rest.csv"
+    stream_synthetic_to_csv(model, FIELDS, 50_000, whole, seed=7, chunk_rows=1_000)
+    stream_synthetic_to_csv(model, FIELDS, 20_000, first, seed=7, chunk_rows=1_000)
+    stream_synthetic_to_csv(model, FIELDS, 30_000, rest, seed=7, chunk_rows=1_000, offset=20_000)
+
+    dataset = pd.read_csv(whole, keep_default_na=False)
+    for field in FIELDS:
+        assert not dataset[field].duplicated().any(), field
+    shards = pd.concat([pd.read_csv(first, keep_default_na=False), pd.read_csv(rest, keep_default_na=False)], ignore_index=True)
+    pd.testing.assert_frame_equal(shards, dataset)
+
+def test_first_template_value_depends_on_the_seed():
+    model = parse_template("AAA-9999")
+    values = [sample_template(model, 1, seeded_rng(seed), 0, (seed, 0))[0] for seed in range(10)]
+    assert len(set(values)) == 10
+    assert "AAA-0000" not in values